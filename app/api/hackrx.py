@@ -1,4 +1,10 @@
-from typing import List
+import asyncio
+import hashlib
+import os
+import shutil
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Tuple
 from fastapi import APIRouter, HTTPException, Depends, Header
 from pydantic import BaseModel
 from app.services.ingest import DocumentIngestionService
@@ -16,15 +22,67 @@ class HackRxRequest(BaseModel):
 class HackRxResponse(BaseModel):
     answers: List[str]
 
+@lru_cache(maxsize=1)
 def get_services():
-    """Dependency to get service instances."""
+    """Dependency to get service instances (created once, shared across requests)."""
+    embed_service = EmbeddingService()
+    graph_service = ClauseGraphService()
+    graph_service.load()
     return {
         "ingest": DocumentIngestionService(),
-        "embed": EmbeddingService(),
-        "graph": ClauseGraphService(),
-        "retrieve": RetrievalService()
+        "embed": embed_service,
+        "graph": graph_service,
+        # Share the index/graph instances so retrieval sees each freshly built document
+        "retrieve": RetrievalService(embedding_service=embed_service, graph_service=graph_service)
     }
 
+def get_retrieval_service() -> RetrievalService:
+    """The shared RetrievalService (same instance get_services hands to the endpoints)."""
+    return get_services()["retrieve"]
+
+def get_ingestion_service() -> DocumentIngestionService:
+    """The shared DocumentIngestionService (same instance get_services hands to the endpoints)."""
+    return get_services()["ingest"]
+
+# Document currently held in memory by the shared embed/graph services (only read or
+# written while holding _document_lock; None whenever that state is incomplete)
+_loaded_doc_key: str | None = None
+# The shared services hold one document at a time: making a document current and answering
+# against it happen under this lock so concurrent requests can't swap the index mid-request
+_document_lock = asyncio.Lock()
+# (doc_key, use_graph, sha256(question)) -> answer, least-recently-used eviction
+_answer_cache: "OrderedDict[Tuple[str, bool, str], str]" = OrderedDict()
+
+def _doc_cache_dir(doc_key: str) -> str:
+    return os.path.join(Config.DOC_CACHE_DIR, doc_key)
+
+def _load_cached_document(doc_key: str, embed_service: EmbeddingService, graph_service: ClauseGraphService) -> bool:
+    """Load a previously built index + graph snapshot for the document, if present."""
+    directory = _doc_cache_dir(doc_key)
+    graph_path = os.path.join(directory, "clause_graph.npz")
+    if not os.path.exists(graph_path) or not embed_service.load_index_from(directory):
+        return False
+    graph_service.load(graph_path)
+    os.utime(directory)  # mark as recently used for eviction
+    return True
+
+def _store_cached_document(doc_key: str, embed_service: EmbeddingService, graph_service: ClauseGraphService) -> None:
+    directory = _doc_cache_dir(doc_key)
+    os.makedirs(directory, exist_ok=True)
+    embed_service.save_index_to(directory)
+    graph_service.save(os.path.join(directory, "clause_graph.npz"))
+    # Evict least-recently-used snapshots beyond the limit
+    entries = sorted(
+        (os.path.getmtime(path), path)
+        for path in (os.path.join(Config.DOC_CACHE_DIR, name) for name in os.listdir(Config.DOC_CACHE_DIR))
+        if os.path.isdir(path)
+    )
+    for _mtime, path in entries[:-Config.MAX_CACHED_DOCS]:
+        shutil.rmtree(path, ignore_errors=True)
+
+def _answer_key(doc_key: str, use_graph: bool, question: str) -> Tuple[str, bool, str]:
+    return (doc_key, use_graph, hashlib.sha256(question.encode("utf-8")).hexdigest())
+
 @router.post("/hackrx/run", response_model=HackRxResponse)
 async def run_hackrx_query(
     request: HackRxRequest,
@@ -46,40 +104,85 @@ async def run_hackrx_query(
         graph_service = services["graph"]
         retrieve_service = services["retrieve"]
         
-        # Step 1: Process document and extract clauses
-        print(f"Processing document: {request.documents}")
-        clauses = ingest_service.process_document(request.documents)
+        global _loaded_doc_key
+        doc_key = await asyncio.to_thread(ingest_service.document_cache_key, request.documents)
         
-        if not clauses:
-            raise HTTPException(
-                status_code=400, 
-                detail="No clauses extracted from document. Please check the document URL."
-            )
-        
-        print(f"Extracted {len(clauses)} clauses from document")
-        
-        # Step 2: Build FAISS index from clauses
-        print("Building FAISS index...")
-        embed_service.build_index(clauses)
-        
-        index_stats = embed_service.get_index_stats()
-        print(f"Index built successfully: {index_stats['index_size']} vectors, {index_stats['dimension']} dimensions")
+        async with _document_lock:
+            already_loaded = bool(doc_key) and doc_key == _loaded_doc_key
+            if not already_loaded:
+                # The shared services are about to change: forget the loaded document until its
+                # replacement is fully in place, so a failure part-way can't leave a stale key
+                _loaded_doc_key = None
+            
+            if already_loaded:
+                print(f"Document already loaded: {request.documents}")
+            elif doc_key and await asyncio.to_thread(_load_cached_document, doc_key, embed_service, graph_service):
+                _loaded_doc_key = doc_key
+                print(f"Loaded cached index and Clause Graph for: {request.documents}")
+            else:
+                # Step 1: Process document and extract clauses
+                print(f"Processing document: {request.documents}")
+                clauses = await ingest_service.process_document_async(request.documents, cache_key=doc_key)
+                
+                if not clauses:
+                    raise HTTPException(
+                        status_code=400, 
+                        detail="No clauses extracted from document. Please check the document URL."
+                    )
+                
+                print(f"Extracted {len(clauses)} clauses from document")
+                
+                # Steps 2 & 3: Build FAISS index and Clause Graph concurrently (independent of each other)
+                print("Building FAISS index and Clause Graph...")
 
-        # Step 3: Build Clause Graph from clauses
-        print("Building Clause Graph...")
-        graph_service.build_graph(clauses)
-        graph_service.save()
-        gstats = graph_service.get_stats()
-        print(f"Clause Graph built: {gstats['nodes']} nodes, {gstats['edges']} edges")
-        
-        # Step 4: Answer questions using retrieval (graph-aware configurable)
-        print(f"Answering {len(request.questions)} questions...")
-        use_graph = True
-        if use_graph_header is not None:
-            # Accept values like: "true", "1", "false", "0"
-            s = use_graph_header.strip().lower()
-            use_graph = s in ("true", "1", "yes", "y")
-        answers = retrieve_service.answer_questions(request.questions, use_graph=use_graph)
+                def build_and_save_graph() -> None:
+                    graph_service.build_graph(clauses)
+                    graph_service.save()
+
+                await asyncio.gather(
+                    asyncio.to_thread(embed_service.build_index, clauses),
+                    asyncio.to_thread(build_and_save_graph),
+                )
+                
+                # Precompute graph degrees into the index metadata for reranking
+                await asyncio.to_thread(lambda: embed_service.set_graph_degrees(graph_service.degrees()))
+                
+                index_stats = embed_service.get_index_stats()
+                print(f"Index built successfully: {index_stats['index_size']} vectors, {index_stats['dimension']} dimensions")
+                gstats = graph_service.get_stats()
+                print(f"Clause Graph built: {gstats['nodes']} nodes, {gstats['edges']} edges")
+                
+                if doc_key:
+                    await asyncio.to_thread(_store_cached_document, doc_key, embed_service, graph_service)
+                    _loaded_doc_key = doc_key
+            
+            # Step 4: Answer questions using retrieval (graph-aware configurable)
+            print(f"Answering {len(request.questions)} questions...")
+            use_graph = True
+            if use_graph_header is not None:
+                # Accept values like: "true", "1", "false", "0"
+                s = use_graph_header.strip().lower()
+                use_graph = s in ("true", "1", "yes", "y")
+            
+            answers: List[str | None] = [None] * len(request.questions)
+            if doc_key:
+                for i, q in enumerate(request.questions):
+                    key = _answer_key(doc_key, use_graph, q)
+                    if key in _answer_cache:
+                        _answer_cache.move_to_end(key)
+                        answers[i] = _answer_cache[key]
+            pending = [i for i, a in enumerate(answers) if a is None]
+            if pending:
+                fresh, from_model = await retrieve_service.answer_questions_detailed_async(
+                    [request.questions[i] for i in pending], use_graph=use_graph
+                )
+                for i, answer, cacheable in zip(pending, fresh, from_model):
+                    answers[i] = answer
+                    # Only model answers are cached; fallbacks get another try on the next request
+                    if doc_key and cacheable:
+                        _answer_cache[_answer_key(doc_key, use_graph, request.questions[i])] = answer
+                while len(_answer_cache) > Config.MAX_CACHED_ANSWERS:
+                    _answer_cache.popitem(last=False)
         
         print("Query processing completed successfully")
         
@@ -101,9 +204,10 @@ async def get_status(services: dict = Depends(get_services)):
     """Get system status including index information."""
     try:
         retrieve_service = services["retrieve"]
-        status = retrieve_service.check_index_status()
+        status = await asyncio.to_thread(retrieve_service.check_index_status)
         graph_service = services.get("graph") or ClauseGraphService()
-        graph_service.load()
+        if not graph_service.nodes:
+            await asyncio.to_thread(graph_service.load)
         gstats = graph_service.get_stats()
         
         return {
@@ -1,6 +1,7 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.hackrx import router as hackrx_router
+from app.api.hackrx import router as hackrx_router, get_retrieval_service, get_ingestion_service, get_services
 from app.utils.config import Config
 
 # Initialize FastAPI app
@@ -33,6 +34,24 @@ async def startup_event():
     except Exception as e:
         print(f"❌ Configuration validation failed: {str(e)}")
         print("Please check your .env file and ensure GEMINI_API_KEY is set")
+        return
+    
+    # Create the shared services, load any persisted index/graph and warm them before the first request
+    try:
+        timings = await asyncio.to_thread(lambda: get_retrieval_service().warmup())
+        print("✅ Retrieval services warmed up (" + ", ".join(f"{k} {v:.2f}s" for k, v in timings.items()) + ")")
+    except Exception as e:
+        print(f"⚠️ Warming up retrieval services failed: {str(e)}")
+        return
+    
+    # Keep-alive client for document downloads, closed again on shutdown
+    await get_ingestion_service().start_http_client()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Only close services startup actually created; don't build them just to shut down
+    if get_services.cache_info().currsize:
+        await get_ingestion_service().aclose()
 
 @app.get("/")
 async def root():
@@ -1,48 +1,82 @@
-import json
 import os
+import re
 from typing import Dict, List, Any, Set, Tuple
-from collections import defaultdict, deque
+from collections import deque
+import ahocorasick
+import numpy as np
 from app.utils.config import Config
 
 
 class ClauseGraphService:
     """Lightweight clause graph: nodes=clauses, edges=typed relations.
 
-    Storage format (JSON):
-    {
-      "nodes": { clause_id: {"section": str|None} },
-      "edges": [ {"src": id, "dst": id, "type": str, "confidence": float} ]
-    }
+    Only cross-clause relations are stored as edges. Definition/override hints are node
+    flags, and SameSection is implicit from each node's section (see expand_same_section).
+
+    Storage format (NumPy .npz, the in-memory CSR arrays as-is):
+      node_ids[N] str, sections[N] str ("" = none), flags[N] int8,
+      indptr[N+1] int32, neighbors[E] int32, edge_type[E] int8, conf[E] float32
     """
 
     EDGE_TYPES = {"Defines", "RefersTo", "Overrides", "Entails", "SameSection"}
+    # Stable int8 codes for edge types in the CSR arrays (unknown types get len(EDGE_TYPE_CODES))
+    EDGE_TYPE_CODES = ("Defines", "RefersTo", "Overrides", "Entails", "SameSection")
+
+    # Definition and override keyword hints, matched in a single pass over lowered text
+    _KW_RE = re.compile(
+        r"(?P<def> (?:shall mean|means|is defined as) )"
+        r"|(?P<over>notwithstanding|except as provided|subject to clause|unless otherwise stated)"
+    )
+    # Leading section numbering such as "4", "4.2" or "4.2.1"
+    _SEC_RE = re.compile(r"^\s*(\d+(?:\.\d+)*)")
+    # Node flag bits (saved in the "flags" array)
+    _FLAG_DEFINITION = 1
+    _FLAG_OVERRIDE = 2
 
     def __init__(self):
         self.nodes: Dict[str, Dict[str, Any]] = {}
         self.edges: List[Dict[str, Any]] = []
-        self._adj: Dict[str, List[Tuple[str, str, float]]] = defaultdict(list)
+        # CSR adjacency: out-edges of node u are neighbors[indptr[u]:indptr[u + 1]]
+        self._node_ids: List[str] = []
+        self._node_idx: Dict[str, int] = {}
+        self._indptr = np.zeros(1, dtype=np.int32)
+        self._neighbors = np.zeros(0, dtype=np.int32)
+        self._edge_type = np.zeros(0, dtype=np.int8)
+        self._conf = np.zeros(0, dtype=np.float32)
+        # Implicit SameSection: top-level section key -> clause_ids in document order
+        self.section_of: Dict[str, str] = {}
+        self.by_section: Dict[str, List[str]] = {}
+        self._section_pos: Dict[str, int] = {}
+        # Bumped on build/load/save so callers can invalidate values derived from the graph
+        self.version = 0
+        self._degree_cache: Dict[str, int] = {}
+
+    def _invalidate(self) -> None:
+        self.version += 1
+        self._degree_cache = {}
 
     def build_graph(self, clauses: List[Dict[str, Any]]) -> None:
         # Add nodes
         self.nodes = {}
         self.edges = []
-        self._adj = defaultdict(list)
 
-        # Basic section inference (best-effort placeholder)
-        def infer_section(text: str) -> str:
-            # naive: capture leading numbering like "1.", "1.2.", or heading-like tokens
-            t = text.strip().split("\n", 1)[0][:80]
-            return t
+        # Section labels from leading numbering (explicit "section" field wins)
+        sections = [c.get("section") or self._infer_section(c.get("original_text") or "") for c in clauses]
 
         # Add all clauses as nodes
-        for c in clauses:
+        for c, section in zip(clauses, sections):
             cid = c.get("clause_id")
             if not cid:
                 continue
             self.nodes[cid] = {
-                "section": c.get("section") or None
+                "section": section,
+                "is_definition": False,
+                "is_override": False,
             }
 
+        # Single automaton over all clause ids: one pass per text finds every mention
+        id_matcher = self._build_id_matcher(self.nodes.keys())
+
         # Heuristic edge extraction
         for c in clauses:
             cid = c.get("clause_id")
@@ -50,83 +84,213 @@ class ClauseGraphService:
             if not cid or not text:
                 continue
 
-            # RefersTo: find patterns like "clause 4.2" or "Section 3"
+            # RefersTo: simple heuristic, another clause's id string appears in text
             lowered = text.lower()
-            for other in clauses:
-                ocid = other.get("clause_id")
-                if not ocid or ocid == cid:
-                    continue
-                # simple heuristic: if ocid string appears in text
-                if ocid.lower() in lowered:
+            if id_matcher is not None:
+                referenced: Set[str] = set()
+                for _end, ocid in id_matcher.iter(lowered):
+                    if ocid == cid or ocid in referenced:
+                        continue
+                    referenced.add(ocid)
                     self._add_edge(cid, ocid, "RefersTo", 0.7)
 
             # Defines: patterns like "X means" are hard without NLP; use keyword hints
-            if any(kw in lowered for kw in [" shall mean ", " means ", " is defined as "]):
-                # link to SameSection neighbors later; for now, self-loop as marker
-                self._add_edge(cid, cid, "Defines", 0.6)
-
-            # Overrides/Exceptions
-            if any(kw in lowered for kw in ["notwithstanding", "except as provided", "subject to clause", "unless otherwise stated"]):
-                # mark potential override relationship within local neighborhood
-                self._add_edge(cid, cid, "Overrides", 0.6)
-
-        # SameSection grouping (very lightweight: neighbors by proximity in list)
-        for i in range(len(clauses) - 1):
-            a = clauses[i].get("clause_id")
-            b = clauses[i + 1].get("clause_id")
-            if a and b:
-                self._add_edge(a, b, "SameSection", 0.5)
-                self._add_edge(b, a, "SameSection", 0.5)
+            # Overrides/Exceptions: keyword hints as well
+            found = set()
+            for m in self._KW_RE.finditer(lowered):
+                found.add(m.lastgroup)
+                if len(found) == 2:
+                    break
+            # Flags on the node instead of self-loop edges (which BFS can never expand)
+            if "def" in found:
+                self.nodes[cid]["is_definition"] = True
+            if "over" in found:
+                self.nodes[cid]["is_override"] = True
+
+        self._build_csr()
+        self._index_sections()
+        self._invalidate()
+
+    @classmethod
+    def _infer_section(cls, text: str) -> str | None:
+        m = cls._SEC_RE.match(text)
+        return m.group(1) if m else None
+
+    @staticmethod
+    def _section_key(section: str) -> str:
+        """Top-level section number ("4.2.1" -> "4"); non-numeric labels group as-is."""
+        return section.split(".", 1)[0]
+
+    @staticmethod
+    def _build_id_matcher(clause_ids) -> "ahocorasick.Automaton | None":
+        automaton = ahocorasick.Automaton()
+        for cid in clause_ids:
+            automaton.add_word(cid.lower(), cid)
+        if len(automaton) == 0:
+            return None
+        automaton.make_automaton()
+        return automaton
 
     def _add_edge(self, src: str, dst: str, etype: str, conf: float) -> None:
         if etype not in self.EDGE_TYPES:
             return
         self.edges.append({"src": src, "dst": dst, "type": etype, "confidence": float(conf)})
-        self._adj[src].append((dst, etype, float(conf)))
+
+    def _build_csr(self) -> None:
+        """Rebuild the CSR adjacency arrays from self.nodes / self.edges."""
+        self._node_ids = list(self.nodes.keys())
+        self._node_idx = {cid: i for i, cid in enumerate(self._node_ids)}
+        for e in self.edges:
+            for cid in (e["src"], e["dst"]):
+                if cid not in self._node_idx:
+                    self._node_idx[cid] = len(self._node_ids)
+                    self._node_ids.append(cid)
+
+        type_code = {t: i for i, t in enumerate(self.EDGE_TYPE_CODES)}
+        unknown = len(self.EDGE_TYPE_CODES)
+        m = len(self.edges)
+        src = np.fromiter((self._node_idx[e["src"]] for e in self.edges), dtype=np.int32, count=m)
+        dst = np.fromiter((self._node_idx[e["dst"]] for e in self.edges), dtype=np.int32, count=m)
+        etype = np.fromiter((type_code.get(e.get("type", ""), unknown) for e in self.edges), dtype=np.int8, count=m)
+        conf = np.fromiter((float(e.get("confidence", 0.0)) for e in self.edges), dtype=np.float32, count=m)
+
+        # Stable sort keeps per-node edge insertion order for deterministic BFS
+        order = np.argsort(src, kind="stable")
+        self._neighbors = dst[order]
+        self._edge_type = etype[order]
+        self._conf = conf[order]
+        self._indptr = np.zeros(len(self._node_ids) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(src, minlength=len(self._node_ids)), out=self._indptr[1:])
+
+    def _index_sections(self) -> None:
+        """Group nodes by top-level section for implicit SameSection lookups."""
+        self.section_of = {}
+        self.by_section = {}
+        self._section_pos = {}
+        for cid, node in self.nodes.items():
+            section = node.get("section")
+            if not section:
+                continue
+            key = self._section_key(section)
+            members = self.by_section.setdefault(key, [])
+            self.section_of[cid] = key
+            self._section_pos[cid] = len(members)
+            members.append(cid)
+
+    def expand_same_section(self, cid: str) -> List[str]:
+        """Other clauses in the same top-level section, in document order."""
+        key = self.section_of.get(cid)
+        if key is None:
+            return []
+        return [c for c in self.by_section[key] if c != cid]
 
     def save(self, path: str | None = None) -> None:
         p = path or Config.CLAUSE_GRAPH_PATH
         os.makedirs(os.path.dirname(p), exist_ok=True)
-        with open(p, "w", encoding="utf-8") as f:
-            json.dump({"nodes": self.nodes, "edges": self.edges}, f, ensure_ascii=False, indent=2)
+        nodes = [self.nodes.get(cid) or {} for cid in self._node_ids]
+        sections = [n.get("section") or "" for n in nodes]
+        flags = [
+            (self._FLAG_DEFINITION if n.get("is_definition") else 0) | (self._FLAG_OVERRIDE if n.get("is_override") else 0)
+            for n in nodes
+        ]
+        # Uncompressed: the arrays are small and np.load then needs no inflate step
+        with open(p, "wb") as f:
+            np.savez(
+                f,
+                node_ids=np.array(self._node_ids, dtype=str),
+                sections=np.array(sections, dtype=str),
+                flags=np.array(flags, dtype=np.int8),
+                indptr=self._indptr,
+                neighbors=self._neighbors,
+                edge_type=self._edge_type,
+                conf=self._conf,
+            )
+        self._invalidate()
 
     def load(self, path: str | None = None) -> bool:
         p = path or Config.CLAUSE_GRAPH_PATH
         if not os.path.exists(p):
             return False
-        with open(p, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        self.nodes = data.get("nodes", {})
-        self.edges = data.get("edges", [])
-        self._adj = defaultdict(list)
-        for e in self.edges:
-            self._adj[e["src"]].append((e["dst"], e.get("type", ""), float(e.get("confidence", 0.0))))
+        with np.load(p, allow_pickle=False) as data:
+            self._node_ids = data["node_ids"].tolist()
+            sections = data["sections"].tolist()
+            flags = data["flags"].tolist() if "flags" in data else [0] * len(self._node_ids)
+            self._indptr = data["indptr"]
+            self._neighbors = data["neighbors"]
+            self._edge_type = data["edge_type"]
+            self._conf = data["conf"]
+        self._node_idx = {cid: i for i, cid in enumerate(self._node_ids)}
+        self.nodes = {
+            cid: {
+                "section": sec or None,
+                "is_definition": bool(flag & self._FLAG_DEFINITION),
+                "is_override": bool(flag & self._FLAG_OVERRIDE),
+            }
+            for cid, sec, flag in zip(self._node_ids, sections, flags)
+        }
+        # Edge dicts are only kept while building; the CSR arrays are the loaded representation
+        self.edges = []
+        self._index_sections()
+        self._invalidate()
         return True
 
     def expand_from_hits(self, hit_ids: List[str], k_hops: int = 1,
                           types: List[str] | None = None,
                           max_nodes: int = 20) -> List[str]:
         """Return neighbor clause_ids reachable within k hops, filtered by types, excluding hits."""
-        allowed: Set[str] = set(types) if types else set(self.EDGE_TYPES)
-        visited: Set[str] = set(hit_ids)
+        allowed = types if types else self.EDGE_TYPES
+        # Extra trailing slot covers the "unknown type" code and is never allowed
+        allowed_mask = np.zeros(len(self.EDGE_TYPE_CODES) + 1, dtype=bool)
+        for i, t in enumerate(self.EDGE_TYPE_CODES):
+            allowed_mask[i] = t in allowed
+
+        same_section = "SameSection" in allowed
+
+        start_nodes = [self._node_idx[hid] for hid in hit_ids if hid in self._node_idx]
+        visited: Set[int] = set(start_nodes)
         result: List[str] = []
-        q: deque[Tuple[str, int]] = deque((hid, 0) for hid in hit_ids)
+        q: deque[Tuple[int, int]] = deque((u, 0) for u in start_nodes)
         while q and len(result) < max_nodes:
-            node, d = q.popleft()
+            u, d = q.popleft()
             if d == k_hops:
                 continue
-            for (nbr, et, conf) in self._adj.get(node, []):
-                if et not in allowed or conf < 0.5:
-                    continue
+            lo, hi = self._indptr[u], self._indptr[u + 1]
+            keep = allowed_mask[self._edge_type[lo:hi]] & (self._conf[lo:hi] >= 0.5)
+            nbrs = self._neighbors[lo:hi][keep].tolist()
+            if same_section:
+                nbrs += [self._node_idx[c] for c in self.expand_same_section(self._node_ids[u])]
+            for nbr in nbrs:
                 if nbr in visited:
                     continue
                 visited.add(nbr)
-                result.append(nbr)
+                result.append(self._node_ids[nbr])
                 q.append((nbr, d + 1))
         return result
 
     def degree(self, cid: str) -> int:
-        return len(self._adj.get(cid, []))
+        """Connectivity score: stored out-edges + definition/override flags + adjacent same-section clauses.
+
+        Matches the out-degree the graph had when flags and SameSection were explicit edges.
+        Memoized until the graph is rebuilt or reloaded.
+        """
+        deg = self._degree_cache.get(cid)
+        if deg is not None:
+            return deg
+        u = self._node_idx.get(cid)
+        if u is None:
+            return 0
+        node = self.nodes.get(cid) or {}
+        deg = int(self._indptr[u + 1] - self._indptr[u])
+        deg += int(bool(node.get("is_definition"))) + int(bool(node.get("is_override")))
+        pos = self._section_pos.get(cid)
+        if pos is not None:
+            deg += int(pos > 0) + int(pos < len(self.by_section[self.section_of[cid]]) - 1)
+        self._degree_cache[cid] = deg
+        return deg
+
+    def degrees(self) -> Dict[str, int]:
+        """degree() of every node, keyed by clause_id."""
+        return {cid: self.degree(cid) for cid in self.nodes}
 
     def exists(self) -> bool:
         return os.path.exists(Config.CLAUSE_GRAPH_PATH)
@@ -134,7 +298,7 @@ class ClauseGraphService:
     def get_stats(self) -> Dict[str, Any]:
         return {
             "nodes": len(self.nodes),
-            "edges": len(self.edges),
+            "edges": int(len(self._neighbors)),
             "path": Config.CLAUSE_GRAPH_PATH,
             "exists": self.exists(),
         }
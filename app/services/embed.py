@@ -1,59 +1,247 @@
 import os
-import pickle
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Sequence
 import faiss
+import pyarrow as pa
+import pyarrow.parquet as pq
 import google.generativeai as genai
 from app.utils.config import Config
 
 
 def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
-    """L2-normalize vectors along axis 1 to enable cosine similarity with inner product index."""
-    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
-    norms[norms == 0] = 1.0
-    return vectors / norms
+    """L2-normalize vectors along axis 1 (in place) to enable cosine similarity with inner product index.
+
+    Uses FAISS's SIMD routine; zero vectors are left untouched.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def _extract_embeddings(result: Any) -> List[List[float]]:
+    """Pull the list of vectors out of a batched embed_content response."""
+    vectors = result["embedding"] if isinstance(result, dict) else result
+    if vectors and not isinstance(vectors[0], (list, tuple)):
+        # single-text response: wrap to keep a list-of-vectors shape
+        vectors = [vectors]
+    return list(vectors)
+
+
+def _table_from_rows(rows: List[Dict[str, Any]], leading: List[str]) -> pa.Table:
+    """Arrow table over the union of keys in rows (missing values become null)."""
+    keys = dict.fromkeys([*leading, *(k for row in rows for k in row)])
+    return pa.table({k: [row.get(k) for row in rows] for k in keys})
+
+
+class _ChunkMetadata(Sequence):
+    """Read-only, list-like view of per-chunk metadata stored column-wise.
+
+    Chunk columns (clause position, chunk text, chunk index) are Arrow arrays, memory-mapped
+    when loaded from disk. The remaining clause fields are stored once per clause rather than
+    copied onto every chunk; row dicts are only assembled when indexed.
+    """
+
+    def __init__(self, chunks: pa.Table, clauses: List[Dict[str, Any]]):
+        chunks = chunks.combine_chunks()
+        self._clause_pos = chunks.column("clause_pos").to_numpy()
+        self._texts = chunks.column("text")
+        self._chunk_indices = chunks.column("chunk_index").to_numpy()
+        self.clauses = clauses
+
+    @classmethod
+    def from_columns(cls, clause_pos: List[int], texts: List[str], chunk_indices: List[int],
+                     clauses: List[Dict[str, Any]]) -> "_ChunkMetadata":
+        chunks = pa.table({
+            "clause_pos": pa.array(clause_pos, type=pa.int32()),
+            "text": pa.array(texts, type=pa.string()),
+            "chunk_index": pa.array(chunk_indices, type=pa.int32()),
+        })
+        return cls(chunks, clauses)
+
+    @classmethod
+    def load(cls, chunks_path: str, clauses_path: str) -> "_ChunkMetadata":
+        chunks = pq.read_table(chunks_path, memory_map=True)
+        clauses = pq.read_table(clauses_path).to_pylist()
+        return cls(chunks, clauses)
+
+    def save(self, chunks_path: str, clauses_path: str) -> None:
+        pq.write_table(pa.table({
+            "clause_pos": pa.array(self._clause_pos, type=pa.int32()),
+            "text": self._texts,
+            "chunk_index": pa.array(self._chunk_indices, type=pa.int32()),
+        }), chunks_path)
+        self.save_clauses(clauses_path)
+
+    def save_clauses(self, clauses_path: str) -> None:
+        pq.write_table(_table_from_rows(self.clauses, leading=["clause_id"]), clauses_path)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("metadata index out of range")
+        return {
+            **self.clauses[self._clause_pos[i]],
+            "text": self._texts[i].as_py(),
+            "chunk_index": int(self._chunk_indices[i]),
+        }
+
+    def touch(self) -> None:
+        """Fault in every page of the (possibly memory-mapped) chunk columns."""
+        for chunk in self._texts.chunks:
+            for buf in chunk.buffers():
+                if buf is not None and buf.size:
+                    np.frombuffer(buf, dtype=np.uint8)[::4096].sum()
+        self._clause_pos.sum()
+        self._chunk_indices.sum()
+
+    def clause_ids(self) -> List[Any]:
+        """clause_id of every chunk, without materializing the chunk rows."""
+        return [self.clauses[pos].get("clause_id") for pos in self._clause_pos.tolist()]
+
+    def clause_texts(self) -> List[str]:
+        """Full text of every clause (its chunks re-joined), aligned with self.clauses."""
+        parts: List[List[str]] = [[] for _ in self.clauses]
+        for pos, text in zip(self._clause_pos.tolist(), self._texts.to_pylist()):
+            parts[pos].append(text)
+        return [" ".join(p) for p in parts]
 
 
 class EmbeddingService:
     """Service for creating embeddings and managing FAISS index using Gemini."""
 
+    # Gemini accepts at most 100 texts per embed_content request
+    EMBED_BATCH_SIZE = 100
+    EMBED_MAX_WORKERS = 8
+    # Keep IN (...) lookups well under SQLite's bound-variable limit
+    CACHE_LOOKUP_BATCH = 500
+
     def __init__(self):
-        Config.validate()
         genai.configure(api_key=Config.GEMINI_API_KEY)
         self.model = "models/text-embedding-004"
         self.index: faiss.Index | None = None
-        self.metadata: List[Dict[str, Any]] = []
+        self._on_gpu = False
+        self.metadata: _ChunkMetadata = _ChunkMetadata.from_columns([], [], [], [])
+        # Bumped whenever self.metadata is replaced, so dependents can invalidate derived lookups
+        self.metadata_version = 0
+        self.cache_path = Config.EMBED_CACHE_PATH
+        self._init_cache()
+        # query text -> normalized float32 vector; spares the SQLite/Gemini round trip for repeats
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+
+    def _init_cache(self) -> None:
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with closing(sqlite3.connect(self.cache_path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                "hash BLOB, model TEXT, task_type TEXT, vec BLOB, "
+                "PRIMARY KEY(hash, model, task_type))"
+            )
+
+    def _cache_lookup(self, hashes: List[bytes], task_type: str) -> Dict[bytes, List[float]]:
+        """Fetch cached vectors for the given text hashes (one SELECT per lookup batch)."""
+        found: Dict[bytes, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with closing(sqlite3.connect(self.cache_path)) as conn, conn:
+            for i in range(0, len(unique), self.CACHE_LOOKUP_BATCH):
+                batch = unique[i:i + self.CACHE_LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT hash, vec FROM embedding_cache WHERE model = ? AND task_type = ? AND hash IN ({placeholders})",
+                    [self.model, task_type, *batch],
+                )
+                for h, vec in rows:
+                    found[h] = np.frombuffer(vec, dtype=np.float32).tolist()
+        return found
+
+    def _cache_store(self, entries: List[Tuple[bytes, List[float]]], task_type: str) -> None:
+        with closing(sqlite3.connect(self.cache_path)) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (hash, model, task_type, vec) VALUES (?, ?, ?, ?)",
+                [(h, self.model, task_type, np.asarray(v, dtype=np.float32).tobytes()) for h, v in entries],
+            )
 
     def _chunk_text(self, text: str, max_chars: int = 2000) -> List[str]:
-        """Split a long text into chunks no longer than max_chars (word-boundary aware)."""
-        if not text:
+        """Split a long text into chunks no longer than max_chars (word-boundary aware).
+
+        A single word longer than max_chars becomes its own chunk.
+        """
+        words = text.split() if text else []
+        if not words:
             return []
-        words = text.split()
+        if len(text) <= max_chars:
+            return [" ".join(words)]
+
+        # ends[j]: length of words[0..j] joined by single spaces
+        lens = np.fromiter((len(w) for w in words), dtype=np.int64, count=len(words))
+        ends = np.cumsum(lens + 1) - 1
         chunks: List[str] = []
-        current_words: List[str] = []
-        current_len = 0
-        for word in words:
-            # +1 for space
-            if current_len + len(word) + (1 if current_words else 0) > max_chars:
-                if current_words:
-                    chunks.append(" ".join(current_words))
-                current_words = [word]
-                current_len = len(word)
-            else:
-                current_words.append(word)
-                current_len += len(word) + (1 if current_words[:-1] else 0)
-        if current_words:
-            chunks.append(" ".join(current_words))
+        start = 0
+        while start < len(words):
+            offset = ends[start - 1] + 1 if start else 0
+            stop = int(np.searchsorted(ends, offset + max_chars, side="right"))
+            stop = max(stop, start + 1)
+            chunks.append(" ".join(words[start:stop]))
+            start = stop
         return chunks
 
-    def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Create embeddings for a list of texts using Gemini embeddings API."""
-        embeddings: List[List[float]] = []
-        for text in texts:
-            result = genai.embed_content(model=self.model, content=text)
-            vector = result["embedding"] if isinstance(result, dict) else result
-            embeddings.append(vector)
-        return embeddings
+    def _embed_batch(self, texts: List[str], task_type: str) -> List[List[float]]:
+        result = genai.embed_content(model=self.model, content=texts, task_type=task_type)
+        vectors = _extract_embeddings(result)
+        if len(vectors) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+        return vectors
+
+    def create_embeddings(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        """Create embeddings for a list of texts, calling Gemini only for texts not already cached."""
+        if not texts:
+            return []
+        hashes = [hashlib.sha256(text.encode("utf-8")).digest() for text in texts]
+        cached = self._cache_lookup(hashes, task_type)
+
+        uncached_texts: List[str] = []
+        uncached_hashes: List[bytes] = []
+        seen: set = set()
+        for text, h in zip(texts, hashes):
+            if h in cached or h in seen:
+                continue
+            seen.add(h)
+            uncached_texts.append(text)
+            uncached_hashes.append(h)
+
+        if uncached_texts:
+            fresh = self._embed_uncached(uncached_texts, task_type)
+            self._cache_store(list(zip(uncached_hashes, fresh)), task_type)
+            cached.update(zip(uncached_hashes, fresh))
+
+        return [cached[h] for h in hashes]
+
+    def _embed_uncached(self, texts: List[str], task_type: str) -> List[List[float]]:
+        """Embed texts with batched Gemini calls, running multiple batches concurrently."""
+        batches = [texts[i:i + self.EMBED_BATCH_SIZE] for i in range(0, len(texts), self.EMBED_BATCH_SIZE)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0], task_type)
+
+        # Issue batches concurrently; reassemble in original order by batch index
+        results: List[List[List[float]]] = [[] for _ in batches]
+        workers = min(self.EMBED_MAX_WORKERS, len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futures = {ex.submit(self._embed_batch, batch, task_type): i for i, batch in enumerate(batches)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return [vector for batch in results for vector in batch]
 
     def build_index(self, clauses: List[Dict[str, Any]]) -> None:
         """Build FAISS index from clauses (expects each clause dict to contain 'text')."""
@@ -61,20 +249,22 @@ class EmbeddingService:
             raise ValueError("No clauses provided for indexing")
 
         chunked_texts: List[str] = []
-        chunked_meta: List[Dict[str, Any]] = []
+        chunk_clause_pos: List[int] = []
+        chunk_indices: List[int] = []
+        # shared clause fields, stored once per clause (the chunk supplies "text")
+        clause_fields: List[Dict[str, Any]] = []
 
         for clause in clauses:
             text = clause.get("text", "")
             if not isinstance(text, str) or not text.strip():
                 continue
             chunks = self._chunk_text(text, max_chars=2000)
+            pos = len(clause_fields)
+            clause_fields.append({k: v for k, v in clause.items() if k != "text"})
             for idx, chunk in enumerate(chunks):
                 chunked_texts.append(chunk)
-                # store per-chunk metadata retaining original fields + chunk index
-                meta = {**clause}
-                meta["text"] = chunk
-                meta["chunk_index"] = idx
-                chunked_meta.append(meta)
+                chunk_clause_pos.append(pos)
+                chunk_indices.append(idx)
 
         if not chunked_texts:
             raise ValueError("No valid clause chunks to index")
@@ -85,54 +275,219 @@ class EmbeddingService:
         embeddings_array = _l2_normalize(embeddings_array)
 
         # Build FAISS index (inner product == cosine with normalized vectors)
-        dimension = embeddings_array.shape[1]
-        self.index = faiss.IndexFlatIP(dimension)
+        self.index = self._create_index(embeddings_array)
         self.index.add(embeddings_array)
+        self.index = self._maybe_to_gpu(self.index)
 
         # Store metadata aligned by vector index
-        self.metadata = chunked_meta
+        self.metadata = _ChunkMetadata.from_columns(chunk_clause_pos, chunked_texts, chunk_indices, clause_fields)
+        self.metadata_version += 1
 
         # Persist to disk
         self._save_index()
 
+    def set_graph_degrees(self, degrees: Dict[str, int]) -> None:
+        """Store each clause's clause-graph degree in its metadata (as "graph_degree") and persist it.
+
+        Lets reranking read the graph boost straight off the search hits. Call after the graph
+        for the currently indexed clauses has been built; clauses missing from `degrees` get 0.
+        """
+        for clause in self.metadata.clauses:
+            clause["graph_degree"] = int(degrees.get(clause.get("clause_id"), 0))
+        self.metadata.save_clauses(Config.CLAUSE_METADATA_PATH)
+
+    def _index_description(self, count: int, dimension: int) -> str:
+        """FAISS index_factory string for a corpus of `count` vectors."""
+        if count < Config.FAISS_FLAT_MAX_VECTORS:
+            return "Flat"
+        if Config.FAISS_INDEX_FACTORY:
+            return Config.FAISS_INDEX_FACTORY
+        quantization = Config.FAISS_QUANTIZATION
+        if quantization not in ("none", "sq8", "pq4fs"):
+            raise ValueError(f"Unsupported FAISS_QUANTIZATION: {quantization}")
+        # 4-bit PQ FastScan uses M = d/4 sub-quantizers (SIMD-friendly layout)
+        pq_fastscan = f"PQ{dimension // 4}x4fs"
+        if count <= Config.FAISS_HNSW_MAX_VECTORS:
+            if quantization == "pq4fs":
+                description = pq_fastscan
+            else:
+                description = f"HNSW{Config.FAISS_HNSW_M}" + ("_SQ8" if quantization == "sq8" else "")
+        else:
+            storage = {"none": "Flat", "sq8": "SQ8", "pq4fs": pq_fastscan}[quantization]
+            description = f"IVF{Config.FAISS_IVF_NLIST},{storage}"
+        # Scan compressed codes, then rerank the candidates with exact float32 inner products
+        if quantization != "none" and Config.FAISS_REFINE_K_FACTOR > 0:
+            description += ",RFlat"
+        return description
+
+    def _create_index(self, embeddings_array: np.ndarray) -> faiss.Index:
+        """Pick an inner-product index sized to the corpus; trains it when required."""
+        count, dimension = embeddings_array.shape
+        description = self._index_description(count, dimension)
+        index = faiss.index_factory(dimension, description, faiss.METRIC_INNER_PRODUCT)
+        for hnsw in self._hnsw_graphs(index):
+            hnsw.efConstruction = Config.FAISS_HNSW_EF_CONSTRUCTION
+        if not index.is_trained:
+            index.train(embeddings_array)
+        self._configure_search(index)
+        return index
+
+    def _configure_search(self, index: faiss.Index) -> None:
+        """Apply query-time parameters (efSearch / nprobe) for approximate indexes."""
+        for hnsw in self._hnsw_graphs(index):
+            hnsw.efSearch = Config.FAISS_HNSW_EF_SEARCH
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.nprobe = Config.FAISS_NPROBE
+        if isinstance(index, faiss.IndexRefine):
+            index.k_factor = Config.FAISS_REFINE_K_FACTOR
+
+    @staticmethod
+    def _hnsw_graphs(index: faiss.Index) -> List[Any]:
+        """HNSW graphs in the index: its own, and/or an IVF coarse quantizer's (e.g. "IVF1024_HNSW32,...")."""
+        if isinstance(index, faiss.IndexRefine):
+            index = faiss.downcast_index(index.base_index)
+        graphs = [index.hnsw] if hasattr(index, "hnsw") else []
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            quantizer = faiss.downcast_index(ivf.quantizer)
+            if hasattr(quantizer, "hnsw"):
+                graphs.append(quantizer.hnsw)
+        return graphs
+
+    def _maybe_to_gpu(self, index: faiss.Index) -> faiss.Index:
+        """Replicate the index onto all GPUs when enabled; CPU-only builds and unsupported index types stay on CPU."""
+        self._on_gpu = False
+        if not Config.USE_GPU_FAISS or not hasattr(faiss, "index_cpu_to_all_gpus"):
+            return index
+        if faiss.get_num_gpus() == 0:
+            return index
+        try:
+            gpu_index = faiss.index_cpu_to_all_gpus(index)
+        except RuntimeError as e:
+            print(f"FAISS GPU offload unavailable for {type(index).__name__}: {e}")
+            return index
+        self._on_gpu = True
+        return gpu_index
+
     def search_index(self, query: str, top_k: int = 3) -> List[Tuple[Dict[str, Any], float]]:
         """Search FAISS index for similar clauses, return (clause_dict, score)."""
+        return self.search_index_batch([query], top_k=top_k)[0]
+
+    def search_index_batch(self, queries: List[str], top_k: int = 3) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """Search FAISS index for several queries at once: one embed call, one FAISS search.
+
+        Returns one list of (clause_dict, score) per query, in query order.
+        """
+        if not queries:
+            return []
+        return self.search_embeddings(self.embed_texts(queries), top_k=top_k)
+
+    def search_embeddings(self, embeddings: np.ndarray, top_k: int = 3) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """Search FAISS index with precomputed (normalized) query embeddings, one row per query."""
         if self.index is None:
             self._load_index()
         if self.index is None:
             raise ValueError("No index available for search")
 
-        # Embed and normalize query
-        result = genai.embed_content(model=self.model, content=query)
-        query_embedding = result["embedding"] if isinstance(result, dict) else result
-        query_vector = np.array([query_embedding], dtype=np.float32)
-        query_vector = _l2_normalize(query_vector)
-
-        # Search
-        scores, indices = self.index.search(query_vector, top_k)
-
-        # Collect results with metadata
-        results: List[Tuple[Dict[str, Any], float]] = []
-        for score, idx in zip(scores[0], indices[0]):
-            if 0 <= idx < len(self.metadata):
-                results.append((self.metadata[idx], float(score)))
-        return results
-
-    def _save_index(self) -> None:
-        os.makedirs(os.path.dirname(Config.FAISS_INDEX_PATH), exist_ok=True)
-        faiss.write_index(self.index, Config.FAISS_INDEX_PATH)
-        with open(Config.METADATA_PATH, 'wb') as f:
-            pickle.dump(self.metadata, f)
-
-    def _load_index(self) -> None:
-        if not os.path.exists(Config.FAISS_INDEX_PATH) or not os.path.exists(Config.METADATA_PATH):
+        query_matrix = np.ascontiguousarray(embeddings, dtype=np.float32).reshape(-1, self.index.d)
+
+        # Search (FAISS searches all rows of the matrix in one call)
+        scores, indices = self.index.search(query_matrix, top_k)
+
+        # Collect results with metadata; questions often share hits, so build each row dict once
+        rows: Dict[int, Dict[str, Any]] = {}
+        batch_results: List[List[Tuple[Dict[str, Any], float]]] = []
+        for row_scores, row_indices in zip(scores.tolist(), indices.tolist()):
+            results: List[Tuple[Dict[str, Any], float]] = []
+            for score, idx in zip(row_scores, row_indices):
+                if 0 <= idx < len(self.metadata):
+                    row = rows.get(idx)
+                    if row is None:
+                        row = rows[idx] = self.metadata[idx]
+                    results.append((row, score))
+            batch_results.append(results)
+        return batch_results
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Normalized retrieval-query embeddings for texts as an (N, d) float32 matrix.
+
+        Texts missing from the in-process LRU are embedded together (batched embed_content calls),
+        so N questions cost one request per EMBED_BATCH_SIZE rather than one each.
+        """
+        keys = [text.strip() for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        with self._query_cache_lock:
+            for key in keys:
+                if key in self._query_cache:
+                    self._query_cache.move_to_end(key)
+                    found[key] = self._query_cache[key]
+
+        # Embed and normalize all missing queries together
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            fresh = _l2_normalize(np.array(self.create_embeddings(missing, task_type="retrieval_query"), dtype=np.float32))
+            with self._query_cache_lock:
+                for key, vector in zip(missing, fresh):
+                    self._query_cache[key] = vector
+                    found[key] = vector
+                while len(self._query_cache) > Config.QUERY_EMBED_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+
+        return np.stack([found[key] for key in keys])
+
+    def _save_index(self, index_path: str | None = None, metadata_path: str | None = None,
+                    clause_metadata_path: str | None = None) -> None:
+        index_path = index_path or Config.FAISS_INDEX_PATH
+        metadata_path = metadata_path or Config.METADATA_PATH
+        clause_metadata_path = clause_metadata_path or Config.CLAUSE_METADATA_PATH
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        cpu_index = faiss.index_gpu_to_cpu(self.index) if self._on_gpu else self.index
+        faiss.write_index(cpu_index, index_path)
+        self.metadata.save(metadata_path, clause_metadata_path)
+
+    def _load_index(self, index_path: str | None = None, metadata_path: str | None = None,
+                    clause_metadata_path: str | None = None) -> bool:
+        index_path = index_path or Config.FAISS_INDEX_PATH
+        metadata_path = metadata_path or Config.METADATA_PATH
+        clause_metadata_path = clause_metadata_path or Config.CLAUSE_METADATA_PATH
+        if not all(os.path.exists(p) for p in (index_path, metadata_path, clause_metadata_path)):
+            return False
+        index = faiss.read_index(index_path)
+        self._configure_search(index)
+        self.index = self._maybe_to_gpu(index)
+        self.metadata = _ChunkMetadata.load(metadata_path, clause_metadata_path)
+        self.metadata_version += 1
+        return True
+
+    def load_index(self) -> bool:
+        """Load the persisted index and metadata unless an index is already in memory."""
+        if self.index is not None:
+            return True
+        return self._load_index()
+
+    def warmup(self) -> None:
+        """Page in the loaded metadata and run one local FAISS search (no embedding call)."""
+        if self.index is None:
             return
-        self.index = faiss.read_index(Config.FAISS_INDEX_PATH)
-        with open(Config.METADATA_PATH, 'rb') as f:
-            self.metadata = pickle.load(f)
+        self.metadata.touch()
+        self.index.search(np.zeros((1, self.index.d), dtype=np.float32), 1)
+
+    def _snapshot_paths(self, directory: str) -> Tuple[str, str, str]:
+        return (os.path.join(directory, "faiss_index.bin"),
+                os.path.join(directory, "metadata.parquet"),
+                os.path.join(directory, "clause_metadata.parquet"))
+
+    def save_index_to(self, directory: str) -> None:
+        """Snapshot the current index and metadata into a directory (e.g. a per-document cache entry)."""
+        self._save_index(*self._snapshot_paths(directory))
+
+    def load_index_from(self, directory: str) -> bool:
+        """Load an index snapshot written by save_index_to; returns False if it is missing."""
+        return self._load_index(*self._snapshot_paths(directory))
 
     def index_exists(self) -> bool:
-        return os.path.exists(Config.FAISS_INDEX_PATH) and os.path.exists(Config.METADATA_PATH)
+        return all(os.path.exists(p) for p in (Config.FAISS_INDEX_PATH, Config.METADATA_PATH, Config.CLAUSE_METADATA_PATH))
 
     def get_index_stats(self) -> Dict[str, Any]:
         if self.index is None and self.index_exists():
@@ -1,7 +1,14 @@
 import os
-import json
+import orjson
+import hashlib
 import requests
+import httpx
+import asyncio
 import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Dict, Any
 from pathlib import Path
 
@@ -10,11 +17,77 @@ from docx import Document
 from app.utils.config import Config
 from app.utils.text_utils import clean_text, split_into_clauses, normalize_clause_text
 
+def _extract_pdf_page_range(file_path: str, start: int, stop: int) -> str:
+    """Extract text for pages [start, stop) in its own document handle (PyMuPDF is not thread-safe)."""
+    doc = fitz.open(file_path)
+    try:
+        return "".join(doc.load_page(i).get_text() for i in range(start, stop))
+    finally:
+        doc.close()
+
+
+# Process pool for large-PDF extraction, created on first use and shared by every document.
+# Workers are spawned, not forked: extraction runs on to_thread workers, and forking a
+# multi-threaded process can deadlock the child.
+_pdf_pool: ProcessPoolExecutor | None = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pdf_pool
+
+
+def _discard_pdf_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next document starts a fresh one."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False)
+
+
 class DocumentIngestionService:
     """Service for ingesting and parsing policy documents."""
     
+    # Below this page count, process start-up costs more than parallel extraction saves
+    PDF_PARALLEL_MIN_PAGES = 32
+    # Downloads are streamed to disk in chunks of this size
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+    # Idle connections to document hosts stay open this long, so repeat requests skip DNS + TLS setup
+    DOWNLOAD_KEEPALIVE_SECONDS = 300
+    
     def __init__(self):
         self.config = Config()
+        # Shared HTTP clients: HEAD (cache key) and GET (download) requests reuse pooled connections
+        self._session = requests.Session()
+        # Opened by start_http_client and closed by aclose (the app's startup/shutdown events)
+        self._async_client: httpx.AsyncClient | None = None
+        self._async_client_loop: asyncio.AbstractEventLoop | None = None
+    
+    def _new_async_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=30,
+            follow_redirects=True,
+            limits=httpx.Limits(keepalive_expiry=self.DOWNLOAD_KEEPALIVE_SECONDS),
+        )
+    
+    async def start_http_client(self) -> None:
+        """Open the shared async download client on the running event loop."""
+        if self._async_client is None:
+            self._async_client = self._new_async_client()
+            self._async_client_loop = asyncio.get_running_loop()
+    
+    async def aclose(self) -> None:
+        """Close the shared async download client and its pooled connections."""
+        client, self._async_client, self._async_client_loop = self._async_client, None, None
+        if client is not None:
+            await client.aclose()
     
     def download_document(self, url: str) -> str:
         """
@@ -26,19 +99,68 @@ class DocumentIngestionService:
         Returns:
             Path to temporary file
         """
+        temp_file = None
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
+            with self._session.get(url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                
+                # Stream body into a temporary file without holding it all in memory
+                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=self._get_file_extension(url))
+                with temp_file:
+                    for chunk in response.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE):
+                        temp_file.write(chunk)
             
-            # Create temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=self._get_file_extension(url))
-            temp_file.write(response.content)
-            temp_file.close()
+            return temp_file.name
+        except Exception as e:
+            self._discard_partial_download(temp_file)
+            raise Exception(f"Failed to download document from {url}: {str(e)}")
+    
+    async def download_document_async(self, url: str) -> str:
+        """
+        Download document from URL to temporary file without blocking the event loop.
+        
+        Args:
+            url: URL to the document
+            
+        Returns:
+            Path to temporary file
+        """
+        try:
+            # The shared client only serves the loop it was opened on; otherwise use a
+            # short-lived client that is closed with the download
+            if self._async_client is not None and self._async_client_loop is asyncio.get_running_loop():
+                temp_file = await self._stream_to_temp_file(self._async_client, url)
+            else:
+                async with self._new_async_client() as client:
+                    temp_file = await self._stream_to_temp_file(client, url)
             
             return temp_file.name
         except Exception as e:
             raise Exception(f"Failed to download document from {url}: {str(e)}")
     
+    async def _stream_to_temp_file(self, client: httpx.AsyncClient, url: str):
+        """GET url into a new temporary file (removed again if the download fails)."""
+        temp_file = None
+        try:
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                
+                # Stream body into a temporary file without holding it all in memory
+                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=self._get_file_extension(url))
+                with temp_file:
+                    async for chunk in response.aiter_bytes(self.DOWNLOAD_CHUNK_SIZE):
+                        temp_file.write(chunk)
+            return temp_file
+        except Exception:
+            self._discard_partial_download(temp_file)
+            raise
+    
+    def _discard_partial_download(self, temp_file) -> None:
+        """Remove a temporary file left behind by a failed download."""
+        if temp_file is not None and os.path.exists(temp_file.name):
+            temp_file.close()
+            os.unlink(temp_file.name)
+    
     def _get_file_extension(self, url: str) -> str:
         """Extract file extension from URL."""
         if url.lower().endswith('.pdf'):
@@ -63,14 +185,25 @@ class DocumentIngestionService:
         """
         try:
             doc = fitz.open(file_path)
-            text = ""
-            
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text += page.get_text()
+            try:
+                page_count = len(doc)
+                workers = min(os.cpu_count() or 1, page_count // self.PDF_PARALLEL_MIN_PAGES)
+                if workers <= 1:
+                    return "".join(doc.load_page(i).get_text() for i in range(page_count))
+            finally:
+                doc.close()
             
-            doc.close()
-            return text
+            # Each worker process opens the file itself and extracts a contiguous page range
+            step = -(-page_count // workers)
+            ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+            pool = _get_pdf_pool()
+            try:
+                parts = pool.map(_extract_pdf_page_range, [file_path] * len(ranges),
+                                 [r[0] for r in ranges], [r[1] for r in ranges])
+                return "".join(parts)
+            except BrokenProcessPool:
+                _discard_pdf_pool(pool)
+                raise
         except Exception as e:
             raise Exception(f"Failed to extract text from PDF {file_path}: {str(e)}")
     
@@ -114,70 +247,160 @@ class DocumentIngestionService:
         else:
             raise ValueError(f"Unsupported file type: {file_path}")
     
-    def process_document(self, url: str) -> List[Dict[str, Any]]:
+    def _is_url(self, url: str) -> bool:
+        return url.lower().startswith("http://") or url.lower().startswith("https://")
+    
+    def process_document(self, url: str, cache_key: str | None = None) -> List[Dict[str, Any]]:
         """
         Process document from URL and extract clauses.
         
         Args:
             url: URL to the policy document
+            cache_key: Precomputed document_cache_key(url), if the caller already has it
             
         Returns:
             List of clause dictionaries with metadata
         """
         try:
+            cache_key = cache_key or self.document_cache_key(url)
+            cached = self._load_cached_clauses(cache_key)
+            if cached is not None:
+                return cached
+            
             # Determine if input is a URL or local file path
-            is_url = url.lower().startswith("http://") or url.lower().startswith("https://")
-            if is_url:
+            if self._is_url(url):
                 temp_file_path = self.download_document(url)
-                cleanup = True
-            else:
-                # Assume local file path (absolute or relative)
-                temp_file_path = url
-                if not os.path.exists(temp_file_path):
-                    raise Exception(f"Local file not found: {temp_file_path}")
-                cleanup = False
+                try:
+                    return self._extract_clauses(temp_file_path, url, cache_key)
+                finally:
+                    # Clean up temporary downloaded file
+                    if os.path.exists(temp_file_path):
+                        os.unlink(temp_file_path)
             
-            try:
-                # Extract text
-                raw_text = self.extract_text_from_document(temp_file_path)
-                
-                # Clean text
-                cleaned_text = clean_text(raw_text)
-                
-                # Split into clauses
-                clause_texts = split_into_clauses(cleaned_text)
-                
-                # Create clause objects
-                clauses = []
-                for i, clause_text in enumerate(clause_texts):
-                    if len(clause_text.strip()) < 50:  # Skip very short clauses
-                        continue
+            # Assume local file path (absolute or relative)
+            if not os.path.exists(url):
+                raise Exception(f"Local file not found: {url}")
+            return self._extract_clauses(url, url, cache_key)
                     
-                    normalized_text = normalize_clause_text(clause_text)
-                    
-                    clause_obj = {
-                        "clause_id": f"clause_{i+1:04d}",
-                        "text": normalized_text,
-                        "original_text": clause_text,
-                        "length": len(normalized_text),
-                        "source_url": url
-                    }
-                    
-                    clauses.append(clause_obj)
-                
-                # Save clauses to JSON
-                self._save_clauses(clauses)
-                
-                return clauses
-                
+        except Exception as e:
+            raise Exception(f"Failed to process document {url}: {str(e)}")
+    
+    async def process_document_async(self, url: str, cache_key: str | None = None) -> List[Dict[str, Any]]:
+        """
+        Async variant of process_document: downloads with httpx and runs parsing in a worker thread.
+        
+        Args:
+            url: URL to the policy document
+            cache_key: Precomputed document_cache_key(url), if the caller already has it
+            
+        Returns:
+            List of clause dictionaries with metadata
+        """
+        if not self._is_url(url):
+            return await asyncio.to_thread(self.process_document, url, cache_key)
+        try:
+            cache_key = cache_key or await asyncio.to_thread(self.document_cache_key, url)
+            cached = await asyncio.to_thread(self._load_cached_clauses, cache_key)
+            if cached is not None:
+                return cached
+            
+            temp_file_path = await self.download_document_async(url)
+            try:
+                return await asyncio.to_thread(self._extract_clauses, temp_file_path, url, cache_key)
             finally:
-                # Clean up temporary downloaded file only if we created it
-                if 'cleanup' in locals() and cleanup and os.path.exists(temp_file_path):
+                if os.path.exists(temp_file_path):
                     os.unlink(temp_file_path)
-                    
         except Exception as e:
             raise Exception(f"Failed to process document {url}: {str(e)}")
     
+    def _extract_clauses(self, file_path: str, source_url: str, cache_key: str | None = None) -> List[Dict[str, Any]]:
+        """
+        Extract, clean and split a local document into clause dictionaries.
+        
+        Args:
+            file_path: Path to the document on disk
+            source_url: Original document location, recorded on each clause
+            cache_key: Document version key; when given, clauses are cached under it
+            
+        Returns:
+            List of clause dictionaries with metadata
+        """
+        # Extract text
+        raw_text = self.extract_text_from_document(file_path)
+        
+        # Clean text
+        cleaned_text = clean_text(raw_text)
+        
+        # Split into clauses
+        clause_texts = split_into_clauses(cleaned_text)
+        
+        # Create clause objects
+        clauses = []
+        for i, clause_text in enumerate(clause_texts):
+            if len(clause_text.strip()) < 50:  # Skip very short clauses
+                continue
+            
+            normalized_text = normalize_clause_text(clause_text)
+            
+            clause_obj = {
+                "clause_id": f"clause_{i+1:04d}",
+                "text": normalized_text,
+                "original_text": clause_text,
+                "length": len(normalized_text),
+                "source_url": source_url
+            }
+            
+            clauses.append(clause_obj)
+        
+        # Save clauses to JSON
+        self._save_clauses(clauses)
+        if cache_key:
+            self._store_cached_clauses(cache_key, clauses)
+        
+        return clauses
+    
+    def document_cache_key(self, url: str) -> str | None:
+        """
+        Build a cache key from the document location and its version.
+        
+        URLs are versioned by the ETag/Last-Modified response headers and local
+        files by their mtime. Returns None when no version information is available.
+        """
+        if self._is_url(url):
+            try:
+                head = self._session.head(url, timeout=10, allow_redirects=True)
+                version = head.headers.get("ETag") or head.headers.get("Last-Modified")
+            except requests.RequestException:
+                return None
+        elif os.path.exists(url):
+            version = str(os.path.getmtime(url))
+        else:
+            return None
+        if not version:
+            return None
+        return hashlib.sha256(f"{url}|{version}".encode("utf-8")).hexdigest()
+    
+    def _load_cached_clauses(self, cache_key: str | None) -> List[Dict[str, Any]] | None:
+        """Return cached clauses for the key (also refreshing CLAUSES_PATH), or None on a miss."""
+        if not cache_key:
+            return None
+        path = os.path.join(self.config.CLAUSE_CACHE_DIR, f"{cache_key}.json")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                clauses = orjson.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        self._save_clauses(clauses)
+        return clauses
+    
+    def _store_cached_clauses(self, cache_key: str, clauses: List[Dict[str, Any]]) -> None:
+        os.makedirs(self.config.CLAUSE_CACHE_DIR, exist_ok=True)
+        path = os.path.join(self.config.CLAUSE_CACHE_DIR, f"{cache_key}.json")
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(clauses))
+    
     def _save_clauses(self, clauses: List[Dict[str, Any]]) -> None:
         """
         Save clauses to JSON file.
@@ -186,8 +409,8 @@ class DocumentIngestionService:
             clauses: List of clause dictionaries
         """
         try:
-            with open(self.config.CLAUSES_PATH, 'w', encoding='utf-8') as f:
-                json.dump(clauses, f, indent=2, ensure_ascii=False)
+            with open(self.config.CLAUSES_PATH, 'wb') as f:
+                f.write(orjson.dumps(clauses))
         except Exception as e:
             raise Exception(f"Failed to save clauses: {str(e)}")
     
@@ -202,7 +425,7 @@ class DocumentIngestionService:
             if not os.path.exists(self.config.CLAUSES_PATH):
                 return []
             
-            with open(self.config.CLAUSES_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(self.config.CLAUSES_PATH, 'rb') as f:
+                return orjson.loads(f.read())
         except Exception as e:
             raise Exception(f"Failed to load clauses: {str(e)}")
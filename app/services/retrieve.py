@@ -1,123 +1,468 @@
-from typing import List, Dict, Any
-import google.generativeai as genai
-from app.services.embed import EmbeddingService
-from app.utils.config import Config
-from app.services.clause_graph import ClauseGraphService
-
-
-class RetrievalService:
-    """Service for retrieving relevant clauses and generating answers via Gemini."""
-
-    def __init__(self):
-        self.embedding_service = EmbeddingService()
-        self.config = Config()
-        genai.configure(api_key=self.config.GEMINI_API_KEY)
-        self.gen_model = genai.GenerativeModel(self.config.GEMINI_GEN_MODEL)
-        # Graph service (optional if not built yet)
-        self.graph_service = ClauseGraphService()
-        self.graph_service.load()
-
-    def _generate_answer(self, question: str, clauses: List[Dict[str, Any]]) -> str:
-        if not clauses:
-            return "No relevant information found in the policy document."
-
-        context = "\n\n".join([f"Clause {i+1}: {c['text']}" for i, c in enumerate(clauses)])
-        prompt = (
-            "You are a helpful assistant for insurance policy Q&A in India. "
-            "Answer the user's question using ONLY the provided policy clauses. "
-            "If the answer is not in the clauses, say you cannot find it in the policy. "
-            "Be concise and quote exact phrasing when possible.\n\n"
-            f"Question: {question}\n\n"
-            f"Policy Clauses:\n{context}\n\n"
-            "Answer:"
-        )
-        try:
-            resp = self.gen_model.generate_content(prompt)
-            return resp.text.strip() if hasattr(resp, 'text') and resp.text else ""
-        except Exception:
-            # Fallback: return the best clause text
-            return clauses[0]["text"]
-
-    def _graph_expand_and_rerank(self, question: str, hits: List[Any], top_k: int = 5) -> List[Dict[str, Any]]:
-        """Expand FAISS hits via clause graph neighbors and rerank by combined score.
-
-        hits: List of tuples (clause_dict, sim_score)
-        returns: top clauses (dicts)
-        """
-        # Map of clause_id -> (clause_dict, sim)
-        hit_map: Dict[str, Any] = {}
-        for clause, sim in hits:
-            cid = clause.get("clause_id")
-            if cid:
-                hit_map[cid] = (clause, float(sim))
-
-        hit_ids = list(hit_map.keys())
-
-        # If graph not available, return top by sim only
-        if not self.graph_service.exists():
-            return [c for (c, _s) in hits[:top_k]]
-
-        # Expand one hop around hits focusing on key relations
-        neighbor_ids = self.graph_service.expand_from_hits(
-            hit_ids, k_hops=1, types=["Defines", "Overrides", "RefersTo"], max_nodes=20
-        )
-
-        # Gather neighbor clause dicts from metadata (linear scan acceptable for small sets)
-        neighbor_entries: Dict[str, Dict[str, Any]] = {}
-        for nid in neighbor_ids:
-            if nid in hit_map:
-                continue
-            for meta in self.embedding_service.metadata:
-                if meta.get("clause_id") == nid:
-                    neighbor_entries[nid] = meta
-                    break
-
-        # Build scoring pool
-        scored: List[Dict[str, Any]] = []
-        # include hits with sim.
-        for cid, (clause, sim) in hit_map.items():
-            graph_boost = self.graph_service.degree(cid)
-            score = 0.7 * sim + 0.3 * graph_boost
-            scored.append({"clause": clause, "score": score})
-        # include neighbors with zero sim but graph boost
-        for cid, clause in neighbor_entries.items():
-            graph_boost = self.graph_service.degree(cid)
-            score = 0.3 * graph_boost
-            scored.append({"clause": clause, "score": score})
-
-        scored.sort(key=lambda x: x["score"], reverse=True)
-        return [x["clause"] for x in scored[:top_k]]
-
-    def answer_question(self, question: str, use_graph: bool = True) -> str:
-        try:
-            results = self.embedding_service.search_index(question, top_k=5)
-            if use_graph and self.graph_service.exists():
-                top_clauses = self._graph_expand_and_rerank(question, results, top_k=6)
-            else:
-                top_clauses = [c for (c, _s) in results][:6]
-            return self._generate_answer(question, top_clauses)
-        except Exception as e:
-            return f"Error retrieving answer: {str(e)}"
-
-    def answer_questions(self, questions: List[str], use_graph: bool = True) -> List[str]:
-        return [self.answer_question(q, use_graph=use_graph) for q in questions]
-
-    def get_relevant_clauses(self, question: str, top_k: int = 3) -> List[Dict[str, Any]]:
-        try:
-            results = self.embedding_service.search_index(question, top_k=top_k)
-            clauses_with_scores: List[Dict[str, Any]] = []
-            for clause, score in results:
-                c = clause.copy()
-                c["similarity_score"] = score
-                clauses_with_scores.append(c)
-            return clauses_with_scores
-        except Exception:
-            return []
-
-    def check_index_status(self) -> Dict[str, Any]:
-        try:
-            stats = self.embedding_service.get_index_stats()
-            exists = self.embedding_service.index_exists()
-            return {"index_exists": exists, "index_stats": stats, "ready_for_queries": exists and stats.get("index_size", 0) > 0}
-        except Exception as e:
-            return {"index_exists": False, "index_stats": {"index_size": 0, "dimension": 0}, "ready_for_queries": False, "error": str(e)}
+import asyncio
+import datetime
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import closing
+from typing import List, Dict, Any, Tuple
+import numpy as np
+import orjson
+import google.generativeai as genai
+from google.generativeai import caching
+from app.services.embed import EmbeddingService
+from app.utils.config import Config
+from app.services.clause_graph import ClauseGraphService
+
+
+class RetrievalService:
+    """Service for retrieving relevant clauses and generating answers via Gemini."""
+
+    # Max in-flight Gemini generate calls across all requests in the process
+    GEN_CONCURRENCY = 8
+    # The limiter enforcing GEN_CONCURRENCY, one per event loop (asyncio primitives are loop-bound)
+    _gen_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+    # Combined multi-question prompts ask for a JSON {"answers": [...]} response
+    _JSON_RESPONSE = {"response_mime_type": "application/json"}
+    # System instruction stored in the per-document context cache alongside the clauses
+    _CONTEXT_INSTRUCTION = (
+        "You are a helpful assistant for insurance policy Q&A in India. "
+        "Answer the user's question using ONLY the provided policy clauses, starting from the "
+        "clause numbers listed as most relevant. "
+        "If the answer is not in the clauses, say you cannot find it in the policy. "
+        "Be concise and quote exact phrasing when possible."
+    )
+
+    def __init__(self, embedding_service: EmbeddingService | None = None,
+                 graph_service: ClauseGraphService | None = None):
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.config = Config()
+        genai.configure(api_key=self.config.GEMINI_API_KEY)
+        self.gen_model = genai.GenerativeModel(self.config.GEMINI_GEN_MODEL)
+        # Graph service (optional if not built yet)
+        if graph_service is None:
+            graph_service = ClauseGraphService()
+            graph_service.load()
+        self.graph_service = graph_service
+        self.gen_cache_path = self.config.GEN_CACHE_PATH
+        self._init_gen_cache()
+        # clause_id -> first chunk position in embedding metadata, rebuilt when metadata changes
+        self._meta_by_cid: Dict[str, int] = {}
+        self._meta_by_cid_version = -1
+        # graph_service.exists() for the current graph version and batch (avoids a stat per question)
+        self._graph_available_flag = False
+        self._graph_available_version = -1
+        # Gemini context cache for the loaded document: (cache, model, clause_id -> number, fingerprint),
+        # rebuilt when the index metadata changes or the cache nears expiry
+        self._context_cache: Tuple[Any, Any, Dict[str, int], str] | None = None
+        self._context_cache_version = -1
+        self._context_cache_expires = 0.0
+        self._context_cache_lock = threading.Lock()
+
+    def preload(self) -> None:
+        """Load the persisted FAISS index and clause graph now instead of on the first query."""
+        self.embedding_service.load_index()
+        if not self.graph_service.nodes:
+            self.graph_service.load()
+
+    def warmup(self) -> Dict[str, float]:
+        """Preload, then exercise FAISS and the clause graph once so first-query costs are paid at boot.
+
+        Returns the seconds spent in each step.
+        """
+        timings: Dict[str, float] = {}
+        t0 = time.perf_counter()
+        self.preload()
+        timings["load"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        self.embedding_service.warmup()
+        timings["faiss"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        if self.graph_service.nodes:
+            self.graph_service.expand_from_hits([next(iter(self.graph_service.nodes))], k_hops=1, max_nodes=1)
+        timings["graph"] = time.perf_counter() - t0
+        return timings
+
+    def _init_gen_cache(self) -> None:
+        os.makedirs(os.path.dirname(self.gen_cache_path), exist_ok=True)
+        with closing(sqlite3.connect(self.gen_cache_path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS gen_cache ("
+                "key TEXT PRIMARY KEY, answer TEXT, created REAL, accessed REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS gen_cache_accessed ON gen_cache(accessed)")
+
+    def _gen_cache_key(self, prompt: str) -> str:
+        return hashlib.sha256(f"{self.config.GEMINI_GEN_MODEL}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def _gen_cache_get(self, key: str) -> str | None:
+        now = time.time()
+        with closing(sqlite3.connect(self.gen_cache_path)) as conn, conn:
+            row = conn.execute(
+                "SELECT answer FROM gen_cache WHERE key = ? AND created >= ?",
+                (key, now - self.config.GEN_CACHE_TTL_SECONDS),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE gen_cache SET accessed = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def _gen_cache_put(self, key: str, answer: str) -> None:
+        now = time.time()
+        with closing(sqlite3.connect(self.gen_cache_path)) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO gen_cache (key, answer, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, answer, now, now),
+            )
+            # Expire by TTL, then trim least-recently-accessed entries beyond the size bound
+            conn.execute("DELETE FROM gen_cache WHERE created < ?", (now - self.config.GEN_CACHE_TTL_SECONDS,))
+            conn.execute(
+                "DELETE FROM gen_cache WHERE key IN ("
+                "SELECT key FROM gen_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.config.GEN_CACHE_MAX_ENTRIES,),
+            )
+
+    def _build_prompt(self, question: str, clauses: List[Dict[str, Any]]) -> str:
+        context = "\n\n".join([f"Clause {i+1}: {c['text']}" for i, c in enumerate(clauses)])
+        return (
+            "You are a helpful assistant for insurance policy Q&A in India. "
+            "Answer the user's question using ONLY the provided policy clauses. "
+            "If the answer is not in the clauses, say you cannot find it in the policy. "
+            "Be concise and quote exact phrasing when possible.\n\n"
+            f"Question: {question}\n\n"
+            f"Policy Clauses:\n{context}\n\n"
+            "Answer:"
+        )
+
+    def _document_context(self) -> Tuple[Any, Any, Dict[str, int], str] | None:
+        """The loaded document's Gemini context cache, created on first use per index version.
+
+        None when caching is disabled, the document is below the API's minimum cacheable
+        size, or the cache could not be created.
+        """
+        if not self.config.GEN_CONTEXT_CACHE:
+            return None
+        version = self.embedding_service.metadata_version
+        with self._context_cache_lock:
+            if version != self._context_cache_version or time.monotonic() >= self._context_cache_expires:
+                self._drop_context_cache()
+                self._context_cache = self._create_context_cache()
+                self._context_cache_version = version
+                # Refresh a minute early so in-flight prompts never reference an expired cache
+                self._context_cache_expires = time.monotonic() + max(self.config.GEN_CONTEXT_CACHE_TTL_SECONDS - 60, 0)
+            return self._context_cache
+
+    def _create_context_cache(self) -> Tuple[Any, Any, Dict[str, int], str] | None:
+        metadata = self.embedding_service.metadata
+        numbers: Dict[str, int] = {}
+        blocks: List[str] = []
+        for clause, text in zip(metadata.clauses, metadata.clause_texts()):
+            cid = clause.get("clause_id")
+            if cid is None or cid in numbers:
+                continue
+            numbers[cid] = len(numbers) + 1
+            blocks.append(f"Clause {numbers[cid]}: {text}")
+        context = "Policy Clauses:\n" + "\n\n".join(blocks)
+        # ~4 characters per token; smaller documents are rejected by the caching API
+        if len(context) // 4 < self.config.GEN_CONTEXT_CACHE_MIN_TOKENS:
+            return None
+        try:
+            cache = caching.CachedContent.create(
+                model=self.config.GEN_CONTEXT_CACHE_MODEL,
+                system_instruction=self._CONTEXT_INSTRUCTION,
+                contents=[context],
+                ttl=datetime.timedelta(seconds=self.config.GEN_CONTEXT_CACHE_TTL_SECONDS),
+            )
+            model = genai.GenerativeModel.from_cached_content(cached_content=cache)
+        except Exception as e:
+            print(f"Gemini context cache unavailable, using inline prompts: {e}")
+            return None
+        fingerprint = hashlib.sha256(
+            f"{self.config.GEN_CONTEXT_CACHE_MODEL}\n{self._CONTEXT_INSTRUCTION}\n{context}".encode("utf-8")
+        ).hexdigest()
+        return cache, model, numbers, fingerprint
+
+    def _drop_context_cache(self) -> None:
+        if self._context_cache is None:
+            return
+        cache = self._context_cache[0]
+        self._context_cache = None
+        try:
+            cache.delete()
+        except Exception:
+            pass  # expires on its own after the TTL
+
+    def _prepare_generation(self, question: str, clauses: List[Dict[str, Any]],
+                            context: Tuple[Any, Any, Dict[str, int], str] | None) -> Tuple[Any, str, str]:
+        """(model, prompt, gen-cache key) for one question, against the context cache when available."""
+        if context is not None:
+            _cache, model, numbers, fingerprint = context
+            refs = [numbers.get(c.get("clause_id")) for c in clauses]
+            if None not in refs:
+                prompt = (
+                    f"Question: {question}\n\n"
+                    f"Most relevant clauses: {', '.join(str(n) for n in refs)}\n\n"
+                    "Answer:"
+                )
+                # Prompt alone doesn't identify the document, so key on the cached prefix too
+                return model, prompt, self._gen_cache_key(f"{fingerprint}\n{prompt}")
+        prompt = self._build_prompt(question, clauses)
+        return self.gen_model, prompt, self._gen_cache_key(prompt)
+
+    @classmethod
+    def _gen_limiter(cls) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limiter = cls._gen_limiters.get(loop)
+        if limiter is None:
+            limiter = cls._gen_limiters[loop] = asyncio.Semaphore(cls.GEN_CONCURRENCY)
+        return limiter
+
+    async def _generate_answer_async(self, question: str, clauses: List[Dict[str, Any]]) -> Tuple[str, bool]:
+        """(answer, from_model); from_model is False for the no-clause and fallback answers."""
+        if not clauses:
+            return "No relevant information found in the policy document.", False
+
+        context = await asyncio.to_thread(self._document_context) if self.config.GEN_CONTEXT_CACHE else None
+        model, prompt, key = self._prepare_generation(question, clauses, context)
+        cached = await asyncio.to_thread(self._gen_cache_get, key)
+        if cached is not None:
+            return cached, True
+        try:
+            async with self._gen_limiter():
+                resp = await model.generate_content_async(prompt)
+            answer = resp.text.strip() if hasattr(resp, 'text') and resp.text else ""
+            if answer:
+                await asyncio.to_thread(self._gen_cache_put, key, answer)
+            return answer, bool(answer)
+        except Exception:
+            # Fallback: return the best clause text
+            return clauses[0]["text"], False
+
+    def _graph_available(self) -> bool:
+        version = self.graph_service.version
+        if version != self._graph_available_version:
+            self._graph_available_flag = self.graph_service.exists()
+            self._graph_available_version = version
+        return self._graph_available_flag
+
+    def _build_combined_prompt(self, questions: List[str], clause_lists: List[List[Dict[str, Any]]]) -> str:
+        # Each distinct clause text is listed once; questions reference their clauses by number
+        numbers: Dict[str, int] = {}
+        for clauses in clause_lists:
+            for c in clauses:
+                numbers.setdefault(c["text"], len(numbers) + 1)
+        context = "\n\n".join(f"Clause {n}: {text}" for text, n in numbers.items())
+        question_lines = "\n".join(
+            f"Q{i+1} (clauses {', '.join(str(n) for n in dict.fromkeys(numbers[c['text']] for c in clauses))}): {q}"
+            for i, (q, clauses) in enumerate(zip(questions, clause_lists))
+        )
+        return (
+            "You are a helpful assistant for insurance policy Q&A in India. "
+            "Answer each question using ONLY the policy clauses listed for it. "
+            "If the answer is not in those clauses, say you cannot find it in the policy. "
+            "Be concise and quote exact phrasing when possible.\n\n"
+            f"Policy Clauses:\n{context}\n\n"
+            f"Questions:\n{question_lines}\n\n"
+            'Respond with JSON of the form {"answers": ["answer to Q1", ...]} '
+            f"containing exactly {len(questions)} answers, in question order."
+        )
+
+    @staticmethod
+    def _parse_combined_answers(text: str, count: int) -> List[str] | None:
+        try:
+            data = orjson.loads(text)
+        except orjson.JSONDecodeError:
+            return None
+        answers = data.get("answers") if isinstance(data, dict) else None
+        if not isinstance(answers, list) or len(answers) != count:
+            return None
+        if not all(isinstance(a, str) and a.strip() for a in answers):
+            return None
+        return [a.strip() for a in answers]
+
+    async def _generate_combined_async(self, questions: List[str],
+                                       clause_lists: List[List[Dict[str, Any]]]) -> List[str] | None:
+        """One Gemini call answering all questions; None if the response is unusable (callers fall back)."""
+        try:
+            prompt = self._build_combined_prompt(questions, clause_lists)
+            key = self._gen_cache_key(prompt)
+            cached = await asyncio.to_thread(self._gen_cache_get, key)
+            answers = self._parse_combined_answers(cached, len(questions)) if cached is not None else None
+            if answers is not None:
+                return answers
+            async with self._gen_limiter():
+                resp = await self.gen_model.generate_content_async(prompt, generation_config=self._JSON_RESPONSE)
+            text = resp.text if hasattr(resp, 'text') and resp.text else ""
+            answers = self._parse_combined_answers(text, len(questions))
+            if answers is not None:
+                await asyncio.to_thread(self._gen_cache_put, key, text)
+            return answers
+        except Exception:
+            return None
+
+    def _metadata_positions(self) -> Dict[str, int]:
+        """clause_id -> position of its first chunk in the embedding metadata."""
+        version = self.embedding_service.metadata_version
+        if version != self._meta_by_cid_version:
+            positions: Dict[str, int] = {}
+            for pos, cid in enumerate(self.embedding_service.metadata.clause_ids()):
+                if cid and cid not in positions:
+                    positions[cid] = pos
+            self._meta_by_cid = positions
+            self._meta_by_cid_version = version
+        return self._meta_by_cid
+
+    def _graph_boost(self, cid: str, clause: Dict[str, Any]) -> int:
+        """Degree precomputed into the metadata at ingest, else looked up on the graph."""
+        degree = clause.get("graph_degree")
+        return self.graph_service.degree(cid) if degree is None else degree
+
+    def _graph_expand_and_rerank(self, question: str, hits: List[Any], top_k: int = 5) -> List[Dict[str, Any]]:
+        """Expand FAISS hits via clause graph neighbors and rerank by combined score.
+
+        hits: List of tuples (clause_dict, sim_score)
+        returns: top clauses (dicts)
+        """
+        # Map of clause_id -> (clause_dict, sim)
+
+        hit_map: Dict[str, Any] = {}
+        for clause, sim in hits:
+            cid = clause.get("clause_id")
+            if cid:
+                hit_map[cid] = (clause, float(sim))
+
+        hit_ids = list(hit_map.keys())
+
+        # If graph not available, return top by sim only
+        if not self._graph_available():
+            return [c for (c, _s) in hits[:top_k]]
+
+        # Expand one hop around hits focusing on key relations
+        neighbor_ids = self.graph_service.expand_from_hits(
+            hit_ids, k_hops=1, types=["Defines", "Overrides", "RefersTo"], max_nodes=20
+        )
+
+        # Gather neighbor clause dicts from metadata via the clause_id lookup
+        metadata = self.embedding_service.metadata
+        meta_by_cid = self._metadata_positions()
+        neighbor_entries: Dict[str, Dict[str, Any]] = {}
+        for nid in neighbor_ids:
+            if nid in hit_map:
+                continue
+            pos = meta_by_cid.get(nid)
+            if pos is not None:
+                neighbor_entries[nid] = metadata[pos]
+
+        # Score the pool (hits with sim, neighbors with graph boost only) as parallel arrays
+        pool = [clause for clause, _sim in hit_map.values()] + list(neighbor_entries.values())
+        sims = np.zeros(len(pool))
+        sims[:len(hit_map)] = [sim for _clause, sim in hit_map.values()]
+        boosts = np.fromiter(
+            (self._graph_boost(cid, clause) for cid, clause in zip([*hit_map, *neighbor_entries], pool)),
+            dtype=np.float64, count=len(pool),
+        )
+        scores = 0.7 * sims + 0.3 * boosts
+
+        # Top-k by score; candidates at or above the k-th score keep pool order so ties stay stable
+        candidates = np.arange(len(pool))
+        if len(pool) > top_k > 0:
+            kth = np.partition(scores, len(pool) - top_k)[len(pool) - top_k]
+            candidates = np.flatnonzero(scores >= kth)
+        top = candidates[np.argsort(-scores[candidates], kind="stable")][:top_k]
+        return [pool[i] for i in top]
+
+    def _select_clauses(self, question: str, results: List[Any], use_graph: bool) -> List[Dict[str, Any]]:
+        if use_graph and self._graph_available():
+            return self._graph_expand_and_rerank(question, results, top_k=6)
+        return [c for (c, _s) in results][:6]
+
+    def answer_question(self, question: str, use_graph: bool = True) -> str:
+        return self.answer_questions([question], use_graph=use_graph)[0]
+
+    def _select_all(self, questions: List[str], batch_results: List[Any],
+                    use_graph: bool) -> Tuple[List[str | None], List[List[Dict[str, Any]]]]:
+        """Clauses per question; answers[i] is already set when question i needs no generation."""
+        # Re-check the graph file once per batch, so deleting it takes effect on the next request
+        self._graph_available_version = -1
+        answers: List[str | None] = [None] * len(questions)
+        selections: List[List[Dict[str, Any]]] = [[] for _ in questions]
+        for i, (question, results) in enumerate(zip(questions, batch_results)):
+            try:
+                selections[i] = self._select_clauses(question, results, use_graph)
+            except Exception as e:
+                answers[i] = f"Error retrieving answer: {str(e)}"
+                continue
+            if not selections[i]:
+                answers[i] = "No relevant information found in the policy document."
+        return answers, selections
+
+    def _combined_groups(self, answers: List[str | None]) -> List[List[int]]:
+        """Indices of unanswered questions, grouped for combined prompts (single leftovers are skipped)."""
+        if not self.config.GEN_COMBINE_QUESTIONS:
+            return []
+        pending = [i for i, a in enumerate(answers) if a is None]
+        size = self.config.GEN_COMBINE_MAX_QUESTIONS
+        groups = [pending[i:i + size] for i in range(0, len(pending), size)]
+        return [g for g in groups if len(g) > 1]
+
+    def answer_questions(self, questions: List[str], use_graph: bool = True) -> List[str]:
+        """Blocking wrapper around answer_questions_async (call from synchronous code only)."""
+        return asyncio.run(self.answer_questions_async(questions, use_graph=use_graph))
+
+    async def answer_questions_async(self, questions: List[str], use_graph: bool = True) -> List[str]:
+        """Answer questions with one embedding call + one FAISS search, then concurrent Gemini calls
+        (bounded process-wide by GEN_CONCURRENCY)."""
+        answers, _from_model = await self.answer_questions_detailed_async(questions, use_graph=use_graph)
+        return answers
+
+    async def answer_questions_detailed_async(self, questions: List[str],
+                                              use_graph: bool = True) -> Tuple[List[str], List[bool]]:
+        """Like answer_questions_async, plus per answer whether it came from the model (or the gen
+        cache) rather than a fallback: error, no-information, empty or raw-clause text."""
+        from_model = [False] * len(questions)
+        try:
+            batch_results = await asyncio.to_thread(self.embedding_service.search_index_batch, questions, 5)
+        except Exception as e:
+            return [f"Error retrieving answer: {str(e)}" for _ in questions], from_model
+
+        answers, selections = self._select_all(questions, batch_results, use_graph)
+
+        async def combine(group: List[int]) -> None:
+            combined = await self._generate_combined_async(
+                [questions[i] for i in group], [selections[i] for i in group]
+            )
+            if combined is not None:
+                for i, a in zip(group, combined):
+                    answers[i], from_model[i] = a, True
+
+        async def answer(i: int) -> None:
+            try:
+                answers[i], from_model[i] = await self._generate_answer_async(questions[i], selections[i])
+            except Exception as e:
+                answers[i] = f"Error retrieving answer: {str(e)}"
+
+        await asyncio.gather(*(combine(g) for g in self._combined_groups(answers)))
+        await asyncio.gather(*(answer(i) for i, a in enumerate(answers) if a is None))
+        return answers, from_model
+
+    def get_relevant_clauses(self, question: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        try:
+            results = self.embedding_service.search_index(question, top_k=top_k)
+            clauses_with_scores: List[Dict[str, Any]] = []
+            for clause, score in results:
+                c = clause.copy()
+                c["similarity_score"] = score
+                clauses_with_scores.append(c)
+            return clauses_with_scores
+        except Exception:
+            return []
+
+    def check_index_status(self) -> Dict[str, Any]:
+        try:
+            stats = self.embedding_service.get_index_stats()
+            exists = self.embedding_service.index_exists()
+            return {"index_exists": exists, "index_stats": stats, "ready_for_queries": exists and stats.get("index_size", 0) > 0}
+        except Exception as e:
+            return {"index_exists": False, "index_stats": {"index_size": 0, "dimension": 0}, "ready_for_queries": False, "error": str(e)}
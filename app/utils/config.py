@@ -11,12 +11,56 @@ class Config:
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     GEMINI_EMBED_MODEL = "models/text-embedding-004"
     GEMINI_GEN_MODEL = "gemini-1.5-flash"
+    # Answer several questions with one prompt that lists their (deduplicated) clauses once
+    GEN_COMBINE_QUESTIONS = os.getenv("GEN_COMBINE_QUESTIONS", "true").strip().lower() in ("true", "1", "yes")
+    GEN_COMBINE_MAX_QUESTIONS = 8
+    # Explicit Gemini context cache holding the instructions + every clause of the loaded document,
+    # so per-question prompts only send the question and relevant clause numbers. Needs a versioned
+    # model and a document above the API's minimum cacheable size; off by default since cached
+    # tokens are billed for storage. Combined prompts (GEN_COMBINE_QUESTIONS) don't use it.
+    GEN_CONTEXT_CACHE = os.getenv("GEN_CONTEXT_CACHE", "false").strip().lower() in ("true", "1", "yes")
+    GEN_CONTEXT_CACHE_MODEL = os.getenv("GEN_CONTEXT_CACHE_MODEL", "models/gemini-1.5-flash-001")
+    GEN_CONTEXT_CACHE_MIN_TOKENS = 32768
+    GEN_CONTEXT_CACHE_TTL_SECONDS = 600
 
     # FAISS Configuration
     FAISS_INDEX_PATH = "data/faiss_index.bin"
-    METADATA_PATH = "data/metadata.pkl"
+    METADATA_PATH = "data/metadata.parquet"
+    CLAUSE_METADATA_PATH = "data/clause_metadata.parquet"
     CLAUSES_PATH = "data/clauses.json"
-    CLAUSE_GRAPH_PATH = "data/clause_graph.json"
+    CLAUSE_GRAPH_PATH = "data/clause_graph.npz"
+
+    # FAISS index selection: exact Flat for small corpora, HNSW mid-size, IVF for large
+    FAISS_FLAT_MAX_VECTORS = 2000
+    FAISS_HNSW_MAX_VECTORS = 10000
+    FAISS_HNSW_M = 32
+    FAISS_HNSW_EF_CONSTRUCTION = 200
+    FAISS_HNSW_EF_SEARCH = 64
+    FAISS_IVF_NLIST = 256
+    FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "16"))
+    # Explicit index_factory string (e.g. "IVF1024_HNSW32,PQ32x8") used instead of the HNSW/IVF
+    # choice above; corpora under FAISS_FLAT_MAX_VECTORS still get an exact Flat index
+    FAISS_INDEX_FACTORY = os.getenv("FAISS_INDEX_FACTORY", "").strip()
+    # Vector storage for approximate indexes: "none" (float32), "sq8" (int8 scalar), "pq4fs" (4-bit PQ FastScan)
+    FAISS_QUANTIZATION = os.getenv("FAISS_QUANTIZATION", "sq8")
+    # Quantized indexes keep float32 copies and rerank k * factor candidates exactly (0 disables)
+    FAISS_REFINE_K_FACTOR = int(os.getenv("FAISS_REFINE_K_FACTOR", "10"))
+    # Move the FAISS index onto GPU(s) when a GPU-enabled faiss build and devices are available
+    USE_GPU_FAISS = os.getenv("USE_GPU_FAISS", "false").strip().lower() in ("true", "1", "yes")
+
+    # Cache Configuration
+    EMBED_CACHE_PATH = "data/embed_cache.sqlite"
+    CLAUSE_CACHE_DIR = "data/clause_cache"
+    # Gemini answers keyed by sha256(model + prompt)
+    GEN_CACHE_PATH = "data/gen_cache.sqlite"
+    GEN_CACHE_TTL_SECONDS = 7 * 24 * 3600
+    GEN_CACHE_MAX_ENTRIES = 10000
+    # Per-document index/metadata/graph snapshots, evicted least-recently-used by mtime
+    DOC_CACHE_DIR = "data/doc_cache"
+    MAX_CACHED_DOCS = 8
+    MAX_CACHED_ANSWERS = 1024
+    # Normalized query embeddings kept in process, least-recently-used eviction
+    QUERY_EMBED_CACHE_SIZE = 4096
 
     # Data directory
     DATA_DIR = "data"
@@ -1,10 +1,142 @@
+import heapq
 import re
-from typing import List
+from typing import List, Tuple
+
+try:
+    import hyperscan  # optional: multi-pattern header stripping in one SIMD pass
+except ImportError:
+    hyperscan = None
+
+# Patterns are compiled once at import; the cleaning functions run for every document and clause
+_PAGE_RE = re.compile(r'Page \d+ of \d+')
+_PAGE_NUMBER_LINE_RE = re.compile(r'^\d+$', re.MULTILINE)
+_URL_RE = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+_EMAIL_RE = re.compile(r'\S+@\S+')
+_HEADERS_TO_REMOVE = [
+    r'AROGYA SANJEEVANI POLICY',
+    r'HEALTH INSURANCE POLICY',
+    r'POLICY DOCUMENT',
+    r'TERMS AND CONDITIONS',
+    r'PRIVACY POLICY',
+    r'DISCLAIMER',
+    r'©.*?All rights reserved',
+    r'Confidential',
+    r'Internal Use Only'
+]
+# One alternation so header stripping is a single scan over the document instead of one per header
+_HEADERS_RE = re.compile('|'.join(f'(?:{header})' for header in _HEADERS_TO_REMOVE), re.IGNORECASE)
+
+def _compile_headers_db():
+    """Hyperscan block-mode database for the header patterns, or None if hyperscan is unavailable."""
+    if hyperscan is None:
+        return None
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(
+        expressions=[header.encode('utf-8') for header in _HEADERS_TO_REMOVE],
+        ids=list(range(len(_HEADERS_TO_REMOVE))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_SOM_LEFTMOST]
+        * len(_HEADERS_TO_REMOVE),
+    )
+    return db
+
+_HEADERS_DB = _compile_headers_db()
+# Byte-level equivalents, used to re-anchor a variable-length header match that overlaps a removed span
+_HEADER_BYTES_RES = [re.compile(header.encode('utf-8'), re.IGNORECASE) for header in _HEADERS_TO_REMOVE]
+
+_HYPHEN_BREAK_RE = re.compile(r'(\w+)-\s*\n\s*(\w+)')
+_WS_RE = re.compile(r'\s+')
+
+# clean_text chunking: a boundary right after a whitespace run not preceded by "-" cannot fall
+# inside a hyphenation fix or a whitespace run, so text on either side can be cleaned separately
+_CLEAN_CHUNK_SIZE = 64 * 1024
+_SAFE_CUT_RE = re.compile(r'(?<=[^\s-])\s+(?=\S)')
+
+_NUMBERED_HEADING_SPLIT_RE = re.compile(r'\n\s*\d+\.\s+')
+_CAPS_HEADING_SPLIT_RE = re.compile(r'\n\s*[A-Z][A-Z\s]{3,}\n')
+_SECTION_SPLIT_RE = re.compile(r'\n\s*(?:Section|Clause)\s+\d+')
+
+_BULLET_RE = re.compile(r'^\s*[•\-\*]\s*', re.MULTILINE)
+_NUMBERING_RE = re.compile(r'^\s*\d+\.\s*', re.MULTILINE)
+
+def _strip_headers(text: str) -> str:
+    """Remove header/footer matches, with the same leftmost-first semantics as _HEADERS_RE.sub."""
+    if _HEADERS_DB is None:
+        return _HEADERS_RE.sub('', text)
+    
+    data = text.encode('utf-8', 'surrogatepass')
+    matches = []
+    def on_match(pattern_id, start, end, flags, context):
+        matches.append((start, pattern_id, end))
+    # A scratch per call keeps concurrent ingestions from sharing scan state
+    _HEADERS_DB.scan(data, match_event_handler=on_match, scratch=hyperscan.Scratch(_HEADERS_DB))
+    if not matches:
+        return text
+    
+    # Leftmost start wins, then the earlier pattern, then the shortest end (lazy ".*?").
+    # Hyperscan reports only the leftmost start per end offset, so a match overlapping a
+    # removed span is searched again from the end of that span.
+    heapq.heapify(matches)
+    parts = []
+    pos = 0
+    while matches:
+        start, pattern_id, end = heapq.heappop(matches)
+        if start < pos:
+            if end > pos:
+                m = _HEADER_BYTES_RES[pattern_id].search(data, pos)
+                if m:
+                    heapq.heappush(matches, (m.start(), pattern_id, m.end()))
+                    if m.end() < end:
+                        # The match ending at `end` may still start after this one; revisit it later
+                        heapq.heappush(matches, (m.start(), pattern_id, end))
+            continue
+        parts.append(data[pos:start])
+        pos = end
+    parts.append(data[pos:])
+    return b''.join(parts).decode('utf-8', 'surrogatepass')
+
+def _iter_line_chunks(text: str, size: int):
+    """Yield consecutive slices of about `size` characters, each ending just after a newline."""
+    pos = 0
+    while pos < len(text):
+        end = text.find('\n', pos + size)
+        end = len(text) if end == -1 else end + 1
+        yield text[pos:end]
+        pos = end
+
+def _strip_line_artifacts(text: str) -> str:
+    """Page numbers, URLs, emails and headers; none of these patterns can match across a newline."""
+    # Remove page numbers and headers
+    text = _PAGE_RE.sub('', text)
+    text = _PAGE_NUMBER_LINE_RE.sub('', text)
+    
+    # Remove URLs and emails
+    text = _URL_RE.sub('', text)
+    text = _EMAIL_RE.sub('', text)
+    
+    # Remove common headers/footers
+    return _strip_headers(text)
+
+def _join_lines(text: str) -> str:
+    # Fix hyphenation at line breaks
+    text = _HYPHEN_BREAK_RE.sub(r'\1\2', text)
+    
+    # Clean whitespace (this also collapses newlines, so no separate blank-line pass is needed)
+    return _WS_RE.sub(' ', text)
+
+def _last_safe_cut(text: str) -> int:
+    """Offset of the last _SAFE_CUT_RE boundary near the end of text (0 if there is none)."""
+    cut = 0
+    for m in _SAFE_CUT_RE.finditer(text, max(0, len(text) - 4096)):
+        cut = m.end()
+    return cut
 
 def clean_text(text: str) -> str:
     """
     Clean and normalize text by removing common artifacts.
     
+    Large documents are processed in line-aligned chunks of _CLEAN_CHUNK_SIZE characters, so
+    every substitution works on a small, cache-resident string instead of the whole text.
+    
     Args:
         text: Raw text from document
         
@@ -14,41 +146,28 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
     
-    # Remove page numbers and headers
-    text = re.sub(r'Page \d+ of \d+', '', text)
-    text = re.sub(r'^\d+$', '', text, flags=re.MULTILINE)
-    
-    # Remove URLs and emails
-    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-    text = re.sub(r'\S+@\S+', '', text)
-    
-    # Remove common headers/footers
-    headers_to_remove = [
-        r'AROGYA SANJEEVANI POLICY',
-        r'HEALTH INSURANCE POLICY',
-        r'POLICY DOCUMENT',
-        r'TERMS AND CONDITIONS',
-        r'PRIVACY POLICY',
-        r'DISCLAIMER',
-        r'©.*?All rights reserved',
-        r'Confidential',
-        r'Internal Use Only'
-    ]
-    
-    for header in headers_to_remove:
-        text = re.sub(header, '', text, flags=re.IGNORECASE)
-    
-    # Fix hyphenation at line breaks
-    text = re.sub(r'(\w+)-\s*\n\s*(\w+)', r'\1\2', text)
-    
-    # Clean whitespace
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'\n\s*\n', '\n\n', text)
+    pieces = []
+    carry = ""
+    for chunk in _iter_line_chunks(text, _CLEAN_CHUNK_SIZE):
+        buffer = carry + _strip_line_artifacts(chunk)
+        # Hand everything up to the last safe boundary to the cross-line passes; keep the rest
+        cut = _last_safe_cut(buffer)
+        pieces.append(_join_lines(buffer[:cut]))
+        carry = buffer[cut:]
+    pieces.append(_join_lines(carry))
     
     # Remove leading/trailing whitespace
-    text = text.strip()
-    
-    return text
+    return "".join(pieces).strip()
+
+def _split_spans(pattern: re.Pattern, text: str, spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Split each (start, end) span of text at the pattern's matches, working on offsets only."""
+    pieces = []
+    for start, end in spans:
+        for m in pattern.finditer(text, start, end):
+            pieces.append((start, m.start()))
+            start = m.end()
+        pieces.append((start, end))
+    return pieces
 
 def split_into_clauses(text: str) -> List[str]:
     """
@@ -63,21 +182,13 @@ def split_into_clauses(text: str) -> List[str]:
     if not text:
         return []
     
-    # Split on numbered headings (1., 2., etc.)
-    clauses = re.split(r'\n\s*\d+\.\s+', text)
-    
-    # Split on ALL CAPS headings
-    clauses = [clause for clause in clauses if clause.strip()]
-    all_caps_split = []
-    for clause in clauses:
-        all_caps_split.extend(re.split(r'\n\s*[A-Z][A-Z\s]{3,}\n', clause))
-    
-    # Split on "Section" or "Clause" markers
-    final_clauses = []
-    for clause in all_caps_split:
-        if clause.strip():
-            section_split = re.split(r'\n\s*(?:Section|Clause)\s+\d+', clause)
-            final_clauses.extend([c.strip() for c in section_split if c.strip()])
+    # Split on numbered headings (1., 2., etc.), then ALL CAPS headings, then "Section" or
+    # "Clause" markers; each level splits the pieces of the previous one. Pieces are tracked as
+    # offsets into text and only sliced once at the end.
+    spans = [(0, len(text))]
+    for pattern in (_NUMBERED_HEADING_SPLIT_RE, _CAPS_HEADING_SPLIT_RE, _SECTION_SPLIT_RE):
+        spans = _split_spans(pattern, text, spans)
+    final_clauses = [c for c in (text[start:end].strip() for start, end in spans) if c]
     
     # If no clear splits found, split on double newlines
     if len(final_clauses) <= 1:
@@ -99,11 +210,11 @@ def normalize_clause_text(text: str) -> str:
         return ""
     
     # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     
     # Remove bullet points and numbering
-    text = re.sub(r'^\s*[•\-\*]\s*', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^\s*\d+\.\s*', '', text, flags=re.MULTILINE)
+    text = _BULLET_RE.sub('', text)
+    text = _NUMBERING_RE.sub('', text)
     
     # Clean up
     text = text.strip()
@@ -3,18 +3,24 @@
 Batch evaluation over local PDFs in docs/dataset using the running API.
 Generates:
 - docs/eval_metrics.csv (per-document latency for Vanilla vs CG-RAG)
-- docs/plots/latency_bar.png (average latency comparison)
+- docs/plots/eval_summary.png (average latency, answer length and non-empty rate comparison)
 
 Requires the API to be running at http://127.0.0.1:8000
 Start it with: python -m uvicorn app.main:app --reload --port 8000
+
+Set EVAL_CONCURRENCY to evaluate several PDFs at once. The API keeps one document
+loaded at a time, so overlapping requests for different PDFs slow each other down
+and skew the latency numbers; the default of 1 keeps them comparable.
 """
 
 import os
 import time
 import csv
+import asyncio
 from pathlib import Path
 from typing import List, Tuple
-import requests
+import httpx
+import orjson
 import statistics
 import matplotlib.pyplot as plt
 
@@ -25,9 +31,11 @@ DATA_DIR = Path("docs/dataset")
 OUT_CSV = Path("docs/eval_metrics.csv")
 PLOT_DIR = Path("docs/plots")
 PLOT_DIR.mkdir(parents=True, exist_ok=True)
-PLOT_LAT = PLOT_DIR / "latency_bar.png"
-PLOT_LEN = PLOT_DIR / "answer_length_bar.png"
-PLOT_SUCC = PLOT_DIR / "success_rate_bar.png"
+PLOT_SUMMARY = PLOT_DIR / "eval_summary.png"
+MODES = ("Vanilla", "CG-RAG")
+
+# PDFs evaluated concurrently (each PDF's Vanilla and CG-RAG runs stay sequential)
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "1"))
 
 # A small, fixed question set suitable for policy PDFs
 QUESTIONS: List[str] = [
@@ -42,108 +50,103 @@ HEADERS_BASE = {
 }
 
 
-def call_api(doc_path: str, use_graph: bool) -> Tuple[List[str], float, int]:
+async def call_api(client: httpx.AsyncClient, doc_path: str, use_graph: bool) -> Tuple[List[str], float, int]:
     payload = {"documents": doc_path, "questions": QUESTIONS}
     headers = dict(HEADERS_BASE)
     headers["X-Use-Graph"] = "true" if use_graph else "false"
-    t0 = time.time()
-    resp = requests.post(RUN_EP, json=payload, headers=headers, timeout=1200)
-    elapsed = time.time() - t0
+    t0 = time.perf_counter()
+    resp = await client.post(RUN_EP, content=orjson.dumps(payload), headers=headers)
+    elapsed = time.perf_counter() - t0
     if resp.status_code != 200:
         return [f"ERROR {resp.status_code}: {resp.text}"], elapsed, resp.status_code
-    data = resp.json()
+    data = orjson.loads(resp.content)
     return data.get("answers", []), elapsed, resp.status_code
 
 
+# Compute simple aggregates from answers
+def stats(ans: List[str]) -> Tuple[float, float]:
+    if not ans:
+        return 0.0, 0.0
+    lengths = [len(a.strip()) for a in ans if isinstance(a, str)]
+    nonempty = sum(1 for a in ans if isinstance(a, str) and a.strip())
+    avg_len = sum(lengths) / len(lengths) if lengths else 0.0
+    nonempty_rate = nonempty / max(1, len(ans))
+    return avg_len, nonempty_rate
+
+
+async def evaluate_pdf(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, pdf: Path) -> List[list]:
+    # Vanilla first: it ingests the document, so the CG-RAG run reuses the loaded index
+    async with semaphore:
+        ans_v, lat_v, code_v = await call_api(client, str(pdf), use_graph=False)
+        ans_g, lat_g, code_g = await call_api(client, str(pdf), use_graph=True)
+
+    print(f"\nEvaluated: {pdf}")
+    print(f"  Vanilla latency: {lat_v:.2f}s (HTTP {code_v})")
+    print(f"  CG-RAG latency: {lat_g:.2f}s (HTTP {code_g})")
+
+    v_len, v_rate = stats(ans_v)
+    g_len, g_rate = stats(ans_g)
+    return [
+        [pdf.name, "Vanilla", f"{lat_v:.4f}", f"{v_len:.1f}", f"{v_rate:.2f}", code_v],
+        [pdf.name, "CG-RAG", f"{lat_g:.4f}", f"{g_len:.1f}", f"{g_rate:.2f}", code_g],
+    ]
+
+
+async def evaluate_all(pdfs: List[Path]) -> List[list]:
+    semaphore = asyncio.Semaphore(max(1, EVAL_CONCURRENCY))
+    async with httpx.AsyncClient(timeout=1200) as client:
+        per_pdf = await asyncio.gather(*(evaluate_pdf(client, semaphore, pdf) for pdf in pdfs))
+    # gather keeps input order, so rows stay sorted by PDF
+    return [row for rows in per_pdf for row in rows]
+
+
 def main() -> None:
     pdfs = sorted([p for p in DATA_DIR.glob("*.pdf") if p.is_file()])
     if not pdfs:
         print("No PDFs found in docs/dataset. Add files and rerun.")
         return
 
-    rows = []
     print(f"Found {len(pdfs)} PDFs")
-    for pdf in pdfs:
-        print(f"\nEvaluating: {pdf}")
-
-        ans_v, lat_v, code_v = call_api(str(pdf), use_graph=False)
-        print(f"  Vanilla latency: {lat_v:.2f}s (HTTP {code_v})")
-
-        ans_g, lat_g, code_g = call_api(str(pdf), use_graph=True)
-        print(f"  CG-RAG latency: {lat_g:.2f}s (HTTP {code_g})")
-
-        # Compute simple aggregates from answers
-        def stats(ans: List[str]) -> Tuple[float, float]:
-            if not ans:
-                return 0.0, 0.0
-            lengths = [len(a.strip()) for a in ans if isinstance(a, str)]
-            nonempty = sum(1 for a in ans if isinstance(a, str) and a.strip())
-            avg_len = sum(lengths) / len(lengths) if lengths else 0.0
-            nonempty_rate = nonempty / max(1, len(ans))
-            return avg_len, nonempty_rate
-
-        v_len, v_rate = stats(ans_v)
-        g_len, g_rate = stats(ans_g)
-
-        rows.append([pdf.name, "Vanilla", f"{lat_v:.4f}", f"{v_len:.1f}", f"{v_rate:.2f}", code_v])
-        rows.append([pdf.name, "CG-RAG", f"{lat_g:.4f}", f"{g_len:.1f}", f"{g_rate:.2f}", code_g])
+    rows = asyncio.run(evaluate_all(pdfs))
 
-    # Write CSV
+    # Write CSV, collecting per-mode aggregates in the same pass
+    agg = {mode: {"lat": [], "len": [], "rate": []} for mode in MODES}
     OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
     with OUT_CSV.open("w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         w.writerow(["document", "mode", "latency_s", "avg_answer_len", "nonempty_rate", "http_code"])
         for r in rows:
             w.writerow(r)
+            a = agg[r[1]]
+            a["lat"].append(float(r[2]))
+            a["len"].append(float(r[3]))
+            a["rate"].append(float(r[4]))
     print(f"Saved: {OUT_CSV}")
 
-    # Aggregate and plot average latency by mode
-    vanilla_lat = [float(r[2]) for r in rows if r[1] == "Vanilla"]
-    graph_lat = [float(r[2]) for r in rows if r[1] == "CG-RAG"]
-
-    avg_v = statistics.mean(vanilla_lat) if vanilla_lat else 0.0
-    avg_g = statistics.mean(graph_lat) if graph_lat else 0.0
-
-    plt.figure(figsize=(6,4))
-    plt.bar(["Vanilla", "CG-RAG"], [avg_v, avg_g], color=["#8888ff", "#44cc88"])
-    plt.ylabel("Average latency (s)")
-    plt.title("Average Latency: Vanilla vs CG-RAG")
-    for i, v in enumerate([avg_v, avg_g]):
-        plt.text(i, v + 0.02, f"{v:.2f}s", ha="center")
-    plt.tight_layout()
-    plt.savefig(PLOT_LAT, dpi=150)
-    print(f"Saved plot: {PLOT_LAT}")
-
-    # Aggregate and plot average answer length
-    vanilla_len = [float(r[3]) for r in rows if r[1] == "Vanilla"]
-    graph_len = [float(r[3]) for r in rows if r[1] == "CG-RAG"]
-    avg_len_v = statistics.mean(vanilla_len) if vanilla_len else 0.0
-    avg_len_g = statistics.mean(graph_len) if graph_len else 0.0
-    plt.figure(figsize=(6,4))
-    plt.bar(["Vanilla", "CG-RAG"], [avg_len_v, avg_len_g], color=["#8888ff", "#44cc88"])
-    plt.ylabel("Average answer length (chars)")
-    plt.title("Answer Length: Vanilla vs CG-RAG")
-    for i, v in enumerate([avg_len_v, avg_len_g]):
-        plt.text(i, v + 1, f"{v:.0f}", ha="center")
-    plt.tight_layout()
-    plt.savefig(PLOT_LEN, dpi=150)
-    print(f"Saved plot: {PLOT_LEN}")
-
-    # Aggregate and plot non-empty answer rate
-    vanilla_rate = [float(r[4]) for r in rows if r[1] == "Vanilla"]
-    graph_rate = [float(r[4]) for r in rows if r[1] == "CG-RAG"]
-    avg_rate_v = statistics.mean(vanilla_rate) if vanilla_rate else 0.0
-    avg_rate_g = statistics.mean(graph_rate) if graph_rate else 0.0
-    plt.figure(figsize=(6,4))
-    plt.bar(["Vanilla", "CG-RAG"], [avg_rate_v, avg_rate_g], color=["#8888ff", "#44cc88"])
-    plt.ylabel("Non-empty answer rate")
-    plt.title("Success Rate: Vanilla vs CG-RAG")
-    for i, v in enumerate([avg_rate_v, avg_rate_g]):
-        plt.text(i, v + 0.01, f"{v:.2f}", ha="center")
-    plt.ylim(0, 1)
-    plt.tight_layout()
-    plt.savefig(PLOT_SUCC, dpi=150)
-    print(f"Saved plot: {PLOT_SUCC}")
+    means = {
+        mode: {k: statistics.mean(v) if v else 0.0 for k, v in a.items()}
+        for mode, a in agg.items()
+    }
+
+    # One figure: average latency, answer length and non-empty answer rate side by side
+    panels = [
+        ("lat", "Average latency (s)", "Average Latency: Vanilla vs CG-RAG", "{:.2f}s", 0.02),
+        ("len", "Average answer length (chars)", "Answer Length: Vanilla vs CG-RAG", "{:.0f}", 1),
+        ("rate", "Non-empty answer rate", "Success Rate: Vanilla vs CG-RAG", "{:.2f}", 0.01),
+    ]
+    fig, axes = plt.subplots(1, 3, figsize=(18, 4))
+    for ax, (key, ylabel, title, fmt, offset) in zip(axes, panels):
+        values = [means[mode][key] for mode in MODES]
+        ax.bar(MODES, values, color=["#8888ff", "#44cc88"])
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        for i, v in enumerate(values):
+            ax.text(i, v + offset, fmt.format(v), ha="center")
+    axes[2].set_ylim(0, 1)
+    fig.tight_layout()
+    fig.savefig(PLOT_SUMMARY, dpi=150)
+    plt.close(fig)
+    print(f"Saved plot: {PLOT_SUMMARY}")
 
 
 if __name__ == "__main__":
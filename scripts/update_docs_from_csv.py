@@ -40,7 +40,7 @@ def main() -> None:
     md.append(f"Documents evaluated: {len(docs)}\n")
     md.append("\n| Metric | Vanilla RAG | CG-RAG |\n|---|---:|---:|\n")
     md.append(f"| Avg Latency (s) | {avg_v:.2f} | {avg_g:.2f} |\n")
-    md.append("\nSee plot: docs/plots/latency_bar.png\n")
+    md.append("\nSee plot: docs/plots/eval_summary.png\n")
 
     OUT_PATH.write_text("\n".join(md), encoding="utf-8")
     print("Wrote:", OUT_PATH)
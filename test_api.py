@@ -30,9 +30,9 @@ def test_hackrx_api():
     
     try:
         # Make API request
-        start_time = time.time()
+        start_time = time.perf_counter()
         response = requests.post(url, json=data, timeout=300)  # 5 minute timeout
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         print(f"⏱️  Request completed in {end_time - start_time:.2f} seconds")
         print(f"📊 Status Code: {response.status_code}")
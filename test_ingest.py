@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests for PDF text extraction in the ingestion service (run with pytest)
+"""
+
+import fitz  # PyMuPDF
+
+from app.services import ingest
+from app.services.ingest import DocumentIngestionService
+
+PAGES = 12
+
+
+def _write_pdf(path):
+    doc = fitz.open()
+    for i in range(PAGES):
+        doc.new_page().insert_text((72, 72), f"Clause {i + 1}: page {i + 1} of the policy.")
+    doc.save(str(path))
+    doc.close()
+
+
+def test_parallel_pdf_extraction_matches_sequential(tmp_path, monkeypatch):
+    """Forcing the process-pool path must give the same text as reading the pages in order."""
+    pdf = tmp_path / "policy.pdf"
+    _write_pdf(pdf)
+    service = DocumentIngestionService()
+
+    sequential = service.extract_text_from_pdf(str(pdf))
+
+    monkeypatch.setattr(DocumentIngestionService, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(ingest.os, "cpu_count", lambda: 4)
+    parallel = service.extract_text_from_pdf(str(pdf))
+
+    assert ingest._pdf_pool is not None
+    assert parallel == sequential
+    assert all(f"Clause {i + 1}:" in parallel for i in range(PAGES))